@@ -12,7 +12,7 @@ kwargs = {'author': '',
                  'Topic :: Scientific/Engineering'],
  'description': "'OpenMDAO drivers using DAKOTA (Design Analysis Kit for Optimization and Terascale Applications)'",
  'download_url': '',
- 'entry_points': '[openmdao.component]\ndakota_driver.test.test_driver.VectorStudy=dakota_driver.test.test_driver:VectorStudy\ndakota_driver.driver.DakotaVectorStudy=dakota_driver.driver:DakotaVectorStudy\ndakota_driver.driver.DakotaCONMIN=dakota_driver.driver:DakotaCONMIN\ndakota_driver.test.test_driver.ConstrainedOptimization=dakota_driver.test.test_driver:ConstrainedOptimization\ndakota_driver.test.test_driver.Textbook=dakota_driver.test.test_driver:Textbook\ndakota_driver.test.test_driver.ParameterStudy=dakota_driver.test.test_driver:ParameterStudy\ndakota_driver.test.test_driver.SensitivityStudy=dakota_driver.test.test_driver:SensitivityStudy\ndakota_driver.driver.DakotaBase=dakota_driver.driver:DakotaBase\ndakota_driver.test.test_driver.Optimization=dakota_driver.test.test_driver:Optimization\ndakota_driver.test.test_driver.Rosenbrock=dakota_driver.test.test_driver:Rosenbrock\ndakota_driver.driver.DakotaGlobalSAStudy=dakota_driver.driver:DakotaGlobalSAStudy\ndakota_driver.driver.DakotaOptimizer=dakota_driver.driver:DakotaOptimizer\ndakota_driver.test.test_driver.Broken=dakota_driver.test.test_driver:Broken\ndakota_driver.driver.DakotaMultidimStudy=dakota_driver.driver:DakotaMultidimStudy\n\n[openmdao.driver]\ndakota_driver.driver.DakotaOptimizer=dakota_driver.driver:DakotaOptimizer\ndakota_driver.driver.DakotaVectorStudy=dakota_driver.driver:DakotaVectorStudy\ndakota_driver.driver.DakotaCONMIN=dakota_driver.driver:DakotaCONMIN\ndakota_driver.driver.DakotaBase=dakota_driver.driver:DakotaBase\ndakota_driver.driver.DakotaGlobalSAStudy=dakota_driver.driver:DakotaGlobalSAStudy\ndakota_driver.driver.DakotaMultidimStudy=dakota_driver.driver:DakotaMultidimStudy\n\n[openmdao.container]\ndakota_driver.driver.DakotaOptimizer=dakota_driver.driver:DakotaOptimizer\ndakota_driver.driver.DakotaVectorStudy=dakota_driver.driver:DakotaVectorStudy\ndakota_driver.driver.DakotaCONMIN=dakota_driver.driver:DakotaCONMIN\ndakota_driver.test.test_driver.ConstrainedOptimization=dakota_driver.test.test_driver:ConstrainedOptimization\ndakota_driver.test.test_driver.VectorStudy=dakota_driver.test.test_driver:VectorStudy\ndakota_driver.test.test_driver.SensitivityStudy=dakota_driver.test.test_driver:SensitivityStudy\ndakota_driver.driver.DakotaBase=dakota_driver.driver:DakotaBase\ndakota_driver.test.test_driver.Optimization=dakota_driver.test.test_driver:Optimization\ndakota_driver.driver.DakotaGlobalSAStudy=dakota_driver.driver:DakotaGlobalSAStudy\ndakota_driver.test.test_driver.Rosenbrock=dakota_driver.test.test_driver:Rosenbrock\ndakota_driver.test.test_driver.Textbook=dakota_driver.test.test_driver:Textbook\ndakota_driver.test.test_driver.ParameterStudy=dakota_driver.test.test_driver:ParameterStudy\ndakota_driver.test.test_driver.Broken=dakota_driver.test.test_driver:Broken\ndakota_driver.driver.DakotaMultidimStudy=dakota_driver.driver:DakotaMultidimStudy',
+ 'entry_points': '[openmdao.component]\ndakota_driver.driver.DakotaNewton=dakota_driver.driver:DakotaNewton\ndakota_driver.driver.DakotaSurrogateOptimizer=dakota_driver.driver:DakotaSurrogateOptimizer\ndakota_driver.test.test_driver.VectorStudy=dakota_driver.test.test_driver:VectorStudy\ndakota_driver.driver.DakotaVectorStudy=dakota_driver.driver:DakotaVectorStudy\ndakota_driver.driver.DakotaCONMIN=dakota_driver.driver:DakotaCONMIN\ndakota_driver.test.test_driver.ConstrainedOptimization=dakota_driver.test.test_driver:ConstrainedOptimization\ndakota_driver.test.test_driver.Textbook=dakota_driver.test.test_driver:Textbook\ndakota_driver.test.test_driver.ParameterStudy=dakota_driver.test.test_driver:ParameterStudy\ndakota_driver.test.test_driver.SensitivityStudy=dakota_driver.test.test_driver:SensitivityStudy\ndakota_driver.driver.DakotaBase=dakota_driver.driver:DakotaBase\ndakota_driver.test.test_driver.Optimization=dakota_driver.test.test_driver:Optimization\ndakota_driver.test.test_driver.Rosenbrock=dakota_driver.test.test_driver:Rosenbrock\ndakota_driver.driver.DakotaGlobalSAStudy=dakota_driver.driver:DakotaGlobalSAStudy\ndakota_driver.driver.DakotaOptimizer=dakota_driver.driver:DakotaOptimizer\ndakota_driver.test.test_driver.Broken=dakota_driver.test.test_driver:Broken\ndakota_driver.driver.DakotaMultidimStudy=dakota_driver.driver:DakotaMultidimStudy\ndakota_driver.driver.DakotaMultilevelSampling=dakota_driver.driver:DakotaMultilevelSampling\n\n[openmdao.driver]\ndakota_driver.driver.DakotaNewton=dakota_driver.driver:DakotaNewton\ndakota_driver.driver.DakotaSurrogateOptimizer=dakota_driver.driver:DakotaSurrogateOptimizer\ndakota_driver.driver.DakotaOptimizer=dakota_driver.driver:DakotaOptimizer\ndakota_driver.driver.DakotaVectorStudy=dakota_driver.driver:DakotaVectorStudy\ndakota_driver.driver.DakotaCONMIN=dakota_driver.driver:DakotaCONMIN\ndakota_driver.driver.DakotaBase=dakota_driver.driver:DakotaBase\ndakota_driver.driver.DakotaGlobalSAStudy=dakota_driver.driver:DakotaGlobalSAStudy\ndakota_driver.driver.DakotaMultidimStudy=dakota_driver.driver:DakotaMultidimStudy\ndakota_driver.driver.DakotaMultilevelSampling=dakota_driver.driver:DakotaMultilevelSampling\n\n[openmdao.container]\ndakota_driver.driver.DakotaNewton=dakota_driver.driver:DakotaNewton\ndakota_driver.driver.DakotaSurrogateOptimizer=dakota_driver.driver:DakotaSurrogateOptimizer\ndakota_driver.driver.DakotaOptimizer=dakota_driver.driver:DakotaOptimizer\ndakota_driver.driver.DakotaVectorStudy=dakota_driver.driver:DakotaVectorStudy\ndakota_driver.driver.DakotaCONMIN=dakota_driver.driver:DakotaCONMIN\ndakota_driver.test.test_driver.ConstrainedOptimization=dakota_driver.test.test_driver:ConstrainedOptimization\ndakota_driver.test.test_driver.VectorStudy=dakota_driver.test.test_driver:VectorStudy\ndakota_driver.test.test_driver.SensitivityStudy=dakota_driver.test.test_driver:SensitivityStudy\ndakota_driver.driver.DakotaBase=dakota_driver.driver:DakotaBase\ndakota_driver.test.test_driver.Optimization=dakota_driver.test.test_driver:Optimization\ndakota_driver.driver.DakotaGlobalSAStudy=dakota_driver.driver:DakotaGlobalSAStudy\ndakota_driver.test.test_driver.Rosenbrock=dakota_driver.test.test_driver:Rosenbrock\ndakota_driver.test.test_driver.Textbook=dakota_driver.test.test_driver:Textbook\ndakota_driver.test.test_driver.ParameterStudy=dakota_driver.test.test_driver:ParameterStudy\ndakota_driver.test.test_driver.Broken=dakota_driver.test.test_driver:Broken\ndakota_driver.driver.DakotaMultidimStudy=dakota_driver.driver:DakotaMultidimStudy\ndakota_driver.driver.DakotaMultilevelSampling=dakota_driver.driver:DakotaMultilevelSampling',
  'include_package_data': True,
  'install_requires': ['openmdao.main', 'pyDAKOTA'],
  'keywords': ['openmdao'],
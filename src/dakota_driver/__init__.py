@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
-from .driver import DakotaCONMIN, DakotaMultidimStudy, DakotaVectorStudy, \
-                    DakotaGlobalSAStudy
+from .driver import DakotaCONMIN, DakotaNewton, DakotaSurrogateOptimizer, \
+                    DakotaMultidimStudy, DakotaMultilevelSampling, \
+                    DakotaVectorStudy, DakotaGlobalSAStudy, \
+                    execute_concurrently
 
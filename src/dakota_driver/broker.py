@@ -0,0 +1,277 @@
+"""
+Distributed evaluation via a socket broker.
+
+A :class:`BrokerPool` listens on a TCP address for workers, which may be
+local processes it starts itself or processes on other nodes started with::
+
+    DAKOTA_BROKER_AUTHKEY=<key> python -m dakota_driver.broker host:port
+
+Workers must present the broker's key.  A broker without an explicit key
+uses the current process's key, which only its local workers know, and is
+limited to loopback addresses.  On connecting, each worker is sent a pickled copy of the evaluator (see
+:mod:`dakota_driver.parallel`), then points one at a time.  If a worker's
+connection is lost, the point it was evaluating is resubmitted to another
+worker, and local workers that have died are replaced.
+
+A :class:`BrokerPool` has the same interface as
+:class:`~dakota_driver.parallel.EvaluationPool`, so it can be used with
+:class:`~dakota_driver.parallel.AsyncScheduler`.
+"""
+
+import cPickle
+import logging
+import multiprocessing
+import optparse
+import os
+import Queue
+import socket
+import sys
+import threading
+
+from multiprocessing.connection import Client, Listener
+
+from numpy import empty, ndim
+
+from dakota_driver.parallel import _init_worker, _run_task_safe
+
+__all__ = ['BrokerPool', 'run_worker', 'parse_address']
+
+# Seconds between checks for shutdown by idle connection threads.
+_POLL = 0.1
+
+# Seconds to wait for a local worker to exit after losing its connection.
+_LOST_TIMEOUT = 1.
+
+
+def parse_address(address):
+    """ Return ``(host, port)`` from `address` ``'host:port'``. """
+    host, sep, port = address.rpartition(':')
+    if not sep or not host:
+        raise ValueError("Address %r is not of the form 'host:port'"
+                         % address)
+    return (host, int(port))
+
+
+def _is_loopback(host):
+    """ Return True if `host` resolves to a loopback address. """
+    try:
+        return socket.gethostbyname(host).startswith('127.')
+    except socket.error:
+        return False
+
+
+def run_worker(address, authkey=None):
+    """
+    Connect to the broker at `address` and evaluate points until told to
+    stop or the connection is lost.
+    """
+    conn = Client(address, authkey=authkey)
+    try:
+        conn.send(os.getpid())
+        kind, state = conn.recv()
+        _init_worker(state)
+        while True:
+            kind, task = conn.recv()
+            if kind == 'stop':
+                break
+            conn.send(_run_task_safe(task))
+    except EOFError:
+        pass  # Broker has gone.
+    finally:
+        conn.close()
+
+
+class BrokerPool(object):
+    """
+    Listens on `address` for workers, each of which gets its own copy of
+    `evaluator`, and starts `n_workers` local workers.  `remote_workers`
+    is the number of workers expected to be started elsewhere, which is
+    only used for :attr:`n_workers`.  A point is resubmitted at most
+    `max_resubmits` times after losing its worker.
+
+    Workers must present `authkey`.  If it is None the current process's
+    key is used, which is only known to local workers, and `address` must
+    be a loopback address, otherwise :class:`ValueError` is raised.
+    """
+
+    def __init__(self, evaluator, n_workers, address=('localhost', 0),
+                 authkey=None, remote_workers=0, max_resubmits=3):
+        if authkey is None:
+            if not _is_loopback(address[0]):
+                raise ValueError('A key is required to accept workers on'
+                                 ' %s:%s' % address)
+            authkey = multiprocessing.current_process().authkey
+        self.n_workers = max(n_workers + remote_workers, 1)
+        self.max_resubmits = max_resubmits
+        self._state = cPickle.dumps(evaluator, cPickle.HIGHEST_PROTOCOL)
+        self._authkey = authkey
+        self._tasks = Queue.Queue()
+        self._lock = threading.Lock()
+        self._closing = False
+        self._terminated = False
+        self._threads = []
+        self._listener = Listener(address, authkey=authkey)
+        self.address = self._listener.address
+
+        acceptor = threading.Thread(target=self._accept)
+        acceptor.daemon = True
+        acceptor.start()
+
+        self._processes = []
+        for i in range(n_workers):
+            self._start_worker()
+
+    def evaluate(self, points, asv):
+        """
+        Evaluate each row of `points` and return a 2-D array of responses,
+        one row per point.  `asv` may be a single active set vector or one
+        row per point.
+        """
+        n_points = len(points)
+        if ndim(asv) == 1:
+            asv = [asv] * n_points
+        results = Queue.Queue()
+        for i in range(n_points):
+            self.apply_async((i, points[i], asv[i]), results.put)
+
+        fns = None
+        error = None
+        for i in range(n_points):
+            index, exc, vals = results.get()
+            if exc is not None:
+                error = error or exc
+                continue
+            if fns is None:
+                fns = empty((n_points, len(vals)))
+            fns[index] = vals
+        if error is not None:
+            raise error
+        if fns is None:
+            fns = empty((0, 0))
+        return fns
+
+    def apply_async(self, task, callback):
+        """
+        Start evaluating `task` ``(index, point, asv)``.  When done,
+        `callback` is called (from a connection thread) with
+        ``(index, exception, responses)``.
+        """
+        self._tasks.put((task, callback, 0))
+
+    def close(self):
+        """ Wait for pending work, then shut down the workers. """
+        self._closing = True
+        for proc in list(self._processes):
+            proc.join()
+        for thread in list(self._threads):
+            thread.join()
+        self._listener.close()
+
+    def terminate(self):
+        """ Stop the local workers without waiting for pending work. """
+        self._closing = True
+        self._terminated = True
+        while True:
+            try:
+                self._tasks.get_nowait()
+            except Queue.Empty:
+                break
+        for proc in list(self._processes):
+            proc.terminate()
+            proc.join()
+        # Threads waiting on remote workers are abandoned.
+        for thread in list(self._threads):
+            thread.join(_LOST_TIMEOUT)
+        self._listener.close()
+
+    def _start_worker(self):
+        """ Start a local worker process. """
+        proc = multiprocessing.Process(target=run_worker,
+                                       args=(self.address, self._authkey))
+        proc.daemon = True
+        proc.start()
+        self._processes.append(proc)
+
+    def _accept(self):
+        """ Accept worker connections, serving each in its own thread. """
+        while not self._closing:
+            try:
+                conn = self._listener.accept()
+            except Exception as exc:
+                if not self._closing:
+                    logging.warning('Broker accept failed: %s', exc)
+                continue
+            thread = threading.Thread(target=self._serve, args=(conn,))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _serve(self, conn):
+        """ Send tasks to the worker on `conn` until closing. """
+        job = None
+        pid = None
+        try:
+            pid = conn.recv()
+            conn.send(('init', self._state))
+            while True:
+                try:
+                    job = self._tasks.get(timeout=_POLL)
+                except Queue.Empty:
+                    if self._closing:
+                        conn.send(('stop', None))
+                        break
+                    continue
+                task, callback, resubmits = job
+                conn.send(('eval', task))
+                result = conn.recv()
+                job = None
+                callback(result)
+        except (EOFError, IOError) as exc:
+            if job is not None:
+                self._resubmit(job, exc)
+            self._replace_worker(pid)
+        finally:
+            conn.close()
+
+    def _resubmit(self, job, exc):
+        """ Requeue `job` after losing its worker. """
+        if self._terminated:
+            return
+        task, callback, resubmits = job
+        if resubmits >= self.max_resubmits:
+            callback((task[0],
+                      RuntimeError('Lost %d workers evaluating %s, last: %s'
+                                   % (resubmits + 1, list(task[1]), exc)),
+                      None))
+        else:
+            logging.warning('Lost worker evaluating %s (%s), resubmitting',
+                            list(task[1]), exc)
+            self._tasks.put((task, callback, resubmits + 1))
+
+    def _replace_worker(self, pid):
+        """ If `pid` is a local worker which has died, start another. """
+        with self._lock:
+            for proc in self._processes:
+                if proc.pid == pid:
+                    proc.join(_LOST_TIMEOUT)
+                    if not proc.is_alive():
+                        self._processes.remove(proc)
+                        if not self._closing:
+                            self._start_worker()
+                    break
+
+
+def main(args=None):
+    """ Run a worker for the broker at the address given in `args`. """
+    parser = optparse.OptionParser(usage='%prog host:port\n\n'
+                                   'The broker key is read from'
+                                   ' $DAKOTA_BROKER_AUTHKEY.')
+    options, args = parser.parse_args(args)
+    if len(args) != 1:
+        parser.error('expected broker address')
+    run_worker(parse_address(args[0]),
+               os.environ.get('DAKOTA_BROKER_AUTHKEY') or None)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
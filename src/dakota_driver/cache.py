@@ -0,0 +1,61 @@
+"""
+In-memory cache of DAKOTA evaluations, keyed on the continuous variable
+values and the active set vector.
+"""
+
+from collections import OrderedDict
+
+from numpy import round as np_round
+
+__all__ = ['EvaluationCache']
+
+
+class EvaluationCache(object):
+    """
+    Least-recently-used cache of up to `max_size` evaluations.
+    If `decimals` is not None, variable values are rounded to that many
+    decimal places before being used as a key, so points differing only by
+    round-off share an entry.
+    """
+
+    def __init__(self, max_size, decimals=None):
+        self.max_size = max_size
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, cv, asv):
+        """ Return cache key for `cv` and `asv`. """
+        if self.decimals is not None:
+            cv = np_round(cv, self.decimals)
+        return (tuple(cv), tuple(asv))
+
+    def get(self, cv, asv):
+        """ Return cached value for `cv` and `asv`, or None. """
+        key = self.key(cv, asv)
+        try:
+            value = self._entries.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries[key] = value  # Now most recently used.
+        self.hits += 1
+        return value
+
+    def put(self, cv, asv, value):
+        """ Record `value` for `cv` and `asv`, evicting if necessary. """
+        key = self.key(cv, asv)
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """ Remove all entries and reset counters. """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
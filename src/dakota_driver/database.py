@@ -0,0 +1,81 @@
+"""
+Persistent SQLite store of DAKOTA evaluations.
+
+Evaluations are keyed on a problem `signature` (typically the parameter and
+response names), the continuous variable values and the active set vector.
+Unlike DAKOTA's ``dakota.rst`` restart file, entries don't depend on
+evaluation order, so a store can be shared by restarted runs and by
+different studies over the same design space.
+"""
+
+import cPickle
+import sqlite3
+
+from numpy import array, round as np_round
+
+__all__ = ['EvaluationDatabase']
+
+
+class EvaluationDatabase(object):
+    """
+    Evaluations stored in SQLite file `filename` under `signature`.
+    If `decimals` is not None, variable values are rounded to that many
+    decimal places before being used as a key.
+    Each new entry is committed immediately, so a run that dies loses
+    at most the evaluation in progress.
+    """
+
+    def __init__(self, filename, signature, decimals=None):
+        self.filename = filename
+        self.signature = signature
+        self.decimals = decimals
+        self.hits = 0
+        self._conn = sqlite3.connect(filename)
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS evaluations ('
+                           ' signature TEXT, cv BLOB, asv TEXT,'
+                           ' response BLOB,'
+                           ' PRIMARY KEY (signature, cv, asv))')
+        self._conn.commit()
+
+    def __len__(self):
+        cursor = self._conn.execute('SELECT COUNT(*) FROM evaluations'
+                                    ' WHERE signature = ?',
+                                    (self.signature,))
+        return cursor.fetchone()[0]
+
+    def _key(self, cv, asv):
+        """ Return (cv, asv) key columns. """
+        cv = array(cv, dtype=float)
+        if self.decimals is not None:
+            cv = np_round(cv, self.decimals)
+        return (sqlite3.Binary(cv.tostring()),
+                ' '.join(str(int(bits)) for bits in asv))
+
+    def get(self, cv, asv):
+        """ Return stored response dictionary for `cv` and `asv`, or None. """
+        cv_key, asv_key = self._key(cv, asv)
+        cursor = self._conn.execute('SELECT response FROM evaluations'
+                                    ' WHERE signature = ? AND cv = ?'
+                                    ' AND asv = ?',
+                                    (self.signature, cv_key, asv_key))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        self.hits += 1
+        return cPickle.loads(str(row[0]))
+
+    def put(self, cv, asv, response):
+        """ Store `response` dictionary for `cv` and `asv`. """
+        cv_key, asv_key = self._key(cv, asv)
+        blob = sqlite3.Binary(cPickle.dumps(response, cPickle.HIGHEST_PROTOCOL))
+        self._conn.execute('INSERT OR REPLACE INTO evaluations'
+                           ' VALUES (?, ?, ?, ?)',
+                           (self.signature, cv_key, asv_key, blob))
+        self._conn.commit()
+
+    def close(self):
+        """ Close the database file. """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
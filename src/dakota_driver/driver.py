@@ -3,15 +3,28 @@ A collection of drivers using DAKOTA to exercise the workflow.
 The general scheme is to have a separate class for each separate DAKOTA
 method type.
 
-Currently these drivers simply run the workflow, they do not parse any
-DAKOTA results.
+These drivers don't parse DAKOTA's output.  Results such as an optimizer's
+best point or a sensitivity study's statistics are gathered from the
+evaluations DAKOTA requests.
 """
 
-from numpy import array
+import atexit
+import multiprocessing
+import os
+import shutil
+import tempfile
+import traceback
+import weakref
 
-from dakota import DakotaInput, run_dakota
+from copy import deepcopy
+from time import time
 
-from openmdao.main.datatypes.api import Bool, Enum, Float, Int, List, Str
+from numpy import argsort, array, concatenate, empty, maximum, \
+                  nan, ndim, zeros
+
+from openmdao.main.component import Component
+from openmdao.main.datatypes.api import Array, Bool, Enum, Float, Int, List, \
+                                        Str
 from openmdao.main.driver import Driver
 from openmdao.main.hasparameters import HasParameters
 from openmdao.main.hasconstraints import HasIneqConstraints
@@ -20,9 +33,70 @@ from openmdao.main.interfaces import IHasParameters, IHasIneqConstraints, \
                                      IHasObjectives, IOptimizer, implements
 from openmdao.util.decorators import add_delegate
 
-__all__ = ['DakotaCONMIN', 'DakotaMultidimStudy', 'DakotaVectorStudy',
+__all__ = ['execute_concurrently', 'DakotaCONMIN', 'DakotaNewton',
+           'DakotaSurrogateOptimizer', 'DakotaMultidimStudy',
+           'DakotaMultilevelSampling', 'DakotaVectorStudy',
            'DakotaGlobalSAStudy', 'DakotaOptimizer', 'DakotaBase']
 
+# Extra analysis component identifying the low-fidelity interface.
+_LOW_FIDELITY = 'low_fidelity'
+
+# DAKOTA global surrogate specifications.
+_SURROGATES = {
+    'gaussian_process': 'gaussian_process surfpack',
+    'linear': 'polynomial linear',
+    'quadratic': 'polynomial quadratic',
+    'cubic': 'polynomial cubic',
+    'neural_network': 'neural_network',
+    'radial_basis': 'radial_basis',
+    'mars': 'mars',
+}
+
+# DAKOTA variable sections for each kind of parameter, in the order DAKOTA
+# passes their values to the callback.
+_VARIABLE_SECTIONS = (('continuous', 'continuous_design'),
+                      ('range', 'discrete_design_range'),
+                      ('integer_set', 'discrete_design_set_integer'),
+                      ('real_set', 'discrete_design_set_real'))
+
+# Points per chunk evaluated by the numpy engine of parameter studies.
+_CHUNK_POINTS = 1024
+
+# Maximum points exchanged via shared memory at once by evaluate_batch().
+_MAX_SLOTS = 4096
+
+# Seconds to wait for a session process to exit before terminating it.
+_SESSION_TIMEOUT = 10.
+
+# Drivers which may have a persistent session process.
+_SESSIONS = weakref.WeakSet()
+
+
+def _close_sessions():
+    """ Stop session processes so they don't block interpreter exit. """
+    for driver in list(_SESSIONS):
+        driver.close_session()
+
+atexit.register(_close_sessions)
+
+# Private input directories created by DakotaBase._input_filename().
+_INPUT_DIRS = set()
+
+
+def _remove_input_dirs():
+    """ Remove private input directories. """
+    for directory in _INPUT_DIRS:
+        shutil.rmtree(directory, True)
+    _INPUT_DIRS.clear()
+
+atexit.register(_remove_input_dirs)
+
+
+def _chunks(points):
+    """ Generate chunks of `points` for :meth:`DakotaBase._sample_points`. """
+    for start in range(0, len(points), _CHUNK_POINTS):
+        yield points[start:start + _CHUNK_POINTS]
+
 
 @add_delegate(HasParameters, HasObjectives)
 class DakotaBase(Driver):
@@ -31,6 +105,9 @@ class DakotaBase(Driver):
     The ``method`` and ``responses`` sections of `input` must be set
     directly.  :meth:`set_variables` is typically used to set the ``variables``
     section.
+
+    The DAKOTA binding is only loaded when `input` is first used or DAKOTA
+    is run, so importing and creating drivers is cheap.
     """
 
     implements(IHasParameters, IHasObjectives)
@@ -39,19 +116,151 @@ class DakotaBase(Driver):
                   values=('silent', 'quiet', 'normal', 'verbose', 'debug'))
     stdout = Str('', iotype='in', desc='DAKOTA stdout filename')
     stderr = Str('', iotype='in', desc='DAKOTA stderr filename')
+    input_file = Str('', iotype='in',
+                     desc='DAKOTA input filename, written for debugging.'
+                          ' If empty a private temporary file is used')
     tabular_graphics_data = \
              Bool(iotype='in',
                   desc="Record evaluations to 'dakota_tabular.dat'")
+    n_workers = Int(1, low=1, iotype='in',
+                    desc='Number of worker processes for parallel evaluation')
+    evaluation_concurrency = \
+             Int(0, low=0, iotype='in',
+                 desc='Max evaluations in flight when evaluating in'
+                      ' parallel, 0 for the number of workers')
+    shared_memory = \
+             Bool(True, iotype='in',
+                  desc='Exchange points and responses with local worker'
+                       ' processes via shared memory rather than pickling')
+    broker_address = \
+             Str('', iotype='in',
+                 desc="'host:port' to accept remote evaluation workers on"
+                      " in addition to n_workers local ones,"
+                      " see dakota_driver.broker")
+    broker_authkey = \
+             Str('', iotype='in',
+                 desc='Key workers must present to the broker, required'
+                      ' unless broker_address is a loopback address')
+    remote_workers = Int(0, low=0, iotype='in',
+                         desc='Number of remote workers expected to connect'
+                              ' to broker_address')
+    max_retries = Int(0, low=0, iotype='in',
+                      desc='Times a failed evaluation is retried')
+    failure_action = \
+             Enum('abort', iotype='in', values=('abort', 'nan', 'penalty'),
+                  desc="After retries, 'abort' the run or return NaN or"
+                       " penalty_value responses and continue")
+    penalty_value = Float(1.e30, iotype='in',
+                          desc="Response value for failed evaluations when"
+                               " failure_action is 'penalty'")
+    low_fidelity_evaluations = \
+             Int(0, iotype='out',
+                 desc='Evaluations of the low-fidelity model, see'
+                      ' set_low_fidelity()')
+    failures = List(iotype='out',
+                    desc='(point, message, traceback) of each evaluation'
+                         ' which failed and was not aborted')
+    cache_size = Int(0, low=0, iotype='in',
+                     desc='Max evaluations cached during a run, 0 disables')
+    cache_decimals = Int(-1, low=-1, iotype='in',
+                         desc='Decimal places variables are rounded to for'
+                              ' cache lookup, -1 for exact match')
+    cache_hits = Int(0, iotype='out', desc='Evaluations served from cache')
+    cache_misses = Int(0, iotype='out', desc='Evaluations not found in cache')
+    evaluation_database = \
+             Str('', iotype='in',
+                 desc='SQLite file for storing and reusing evaluations')
+    database_hits = Int(0, iotype='out',
+                        desc='Evaluations served from evaluation_database')
+    tabular_file = Str('', iotype='in',
+                       desc='Binary file evaluations are streamed to,'
+                            ' see dakota_driver.tabular')
+    instrument = Bool(False, iotype='in',
+                      desc='Collect per-phase timing in run_statistics')
+    report_interval = Float(0., low=0., iotype='in',
+                            desc='Seconds between progress log lines when'
+                                 ' instrumented, 0 disables')
+    isolated = Bool(False, iotype='in',
+                    desc='Run DAKOTA and its evaluations in a child process'
+                         ' with its own working directory')
+    persistent_session = \
+             Bool(False, iotype='in',
+                  desc='Run isolated, keeping the child process for later'
+                       ' runs rather than starting one per run')
+
+    # True if DAKOTA's choice of points doesn't depend on the responses,
+    # allowing all points to be collected up front and evaluated in parallel.
+    _deferrable = False
+
+    # True if the method can use a low-fidelity model.
+    _multifidelity = False
 
     def __init__(self):
         super(DakotaBase, self).__init__()
 
-        # Set baseline input, don't touch 'interface'.
-        self.input = DakotaInput(environment=[],
-                                 method=[],
-                                 model=['single'],
-                                 variables=[],
-                                 responses=[])
+        # DakotaInput and its original 'interface' section, see `input`.
+        self._input = None
+        self._interface = None
+        self._low_fidelity = None
+        self._collected = None
+        self._prefetched = {}
+        self._last_point = None
+        self._last_asv = None
+        # (step size, interval type) if gradients are computed by finite
+        # difference here rather than by DAKOTA, set by configure_input().
+        self._driver_fd = None
+        self._scheduler = None
+        # True if gradients come from the workflow or Hessians from
+        # calc_hessians(), set by configure_input().
+        self._analytic_gradients = False
+        self._analytic_hessians = False
+        self._cache = None
+        self._database = None
+        self._layout = None
+        self._stats = None
+        self._tabular = None
+        # (process, connection, directory, key) of a persistent session.
+        self._session = None
+        # Handle of a child started by execute_concurrently().
+        self._started = None
+        self._failed_points = set()
+        # Inputs last used by configure_input(), (index, positions, kind) of
+        # the 'initial_point' lines in the variables section, and the
+        # (filename, sections) last written by run_dakota().
+        self._configured = None
+        self._start_lines = []
+        self._written = None
+        self._input_dir = None
+        # Permutation from DAKOTA's variable order (continuous, discrete
+        # integer, discrete real) to parameter order, None if identity,
+        # positions of integer parameters, and whether any parameters are
+        # discrete.  Set by set_variables().
+        self._var_order = None
+        self._int_positions = []
+        self._discrete = False
+        # RunStatistics from the last instrumented run.
+        self.run_statistics = None
+
+    @property
+    def input(self):
+        """ :class:`DakotaInput` instance, created on first use. """
+        if self._input is None:
+            from dakota import DakotaInput
+            # Set baseline input, don't touch 'interface'.
+            self._input = DakotaInput(environment=[],
+                                      method=[],
+                                      model=['single'],
+                                      variables=[],
+                                      responses=[])
+            self._interface = list(self._input.interface)
+        return self._input
+
+    def __getstate__(self):
+        """ Return state for pickling, without any child processes. """
+        state = super(DakotaBase, self).__getstate__()
+        state['_session'] = None
+        state['_started'] = None
+        return state
 
     def check_config(self, strict=False):
         """ Verify valid configuration. """
@@ -65,46 +274,756 @@ class DakotaBase(Driver):
         if not objectives:
             self.raise_exception('No objectives, run aborted', ValueError)
 
+        if self._low_fidelity is not None and not self._multifidelity:
+            self.raise_exception('Low fidelity model not supported',
+                                 ValueError)
+
+    def set_low_fidelity(self, assembly):
+        """
+        Use `assembly` as a cheap low-fidelity model of our parent, or
+        remove any low-fidelity model if None.  `assembly` must have the
+        same parameter targets and response variables as our parent,
+        typically being a copy of it with cheaper components.  Its
+        evaluations aren't cached, stored or parallelized.
+        """
+        self._low_fidelity = assembly
+
+    def _hierarchical_model(self, model_id='HIERARCH'):
+        """
+        Return ``model`` section lines for hierarchical model `model_id`
+        over low- and high-fidelity models, setting the ``interface``
+        section to distinguish them in :meth:`dakota_callback`.
+        The hierarchical model is specified last, so it's the default.
+        """
+        dakota_input = self.input
+        interface = [line for line in self._interface
+                     if 'analysis_components' not in line]
+        dakota_input.interface = ["id_interface = 'LOFI_I'"] + interface + [
+            "  analysis_components = '%s' '%s'" % (id(self), _LOW_FIDELITY),
+            'interface',
+            "id_interface = 'HIFI_I'"] + interface
+        return [
+            "id_model = 'LOFI'",
+            'single',
+            "  interface_pointer = 'LOFI_I'",
+            'model',
+            "id_model = 'HIFI'",
+            'single',
+            "  interface_pointer = 'HIFI_I'",
+            'model',
+            "id_model = '%s'" % model_id,
+            'surrogate hierarchical',
+            "  low_fidelity_model_pointer = 'LOFI'",
+            "  high_fidelity_model_pointer = 'HIFI'",
+            '  correction additive zeroth_order']
+
     def configure_input(self):
         """ Configures input specification, must be overridden. """
         self.raise_exception('configure_input', NotImplementedError)
 
     def execute(self):
-        """ Write DAKOTA input and run. """
-        self.configure_input()
-        self.run_dakota()
+        """
+        Write DAKOTA input and run.  If there's more than one worker (see
+        `n_workers` and `broker_address`) and the method's points don't
+        depend on responses, DAKOTA is first run to collect the points,
+        which are then evaluated in parallel and served to DAKOTA's second
+        (real) run.
+
+        If `evaluation_database` is set, previously stored evaluations for
+        the same parameters and responses are reused and new ones are added.
+        This is independent of (and may be combined with) DAKOTA's own
+        ``dakota.rst`` restart file.
+
+        The input specification is only regenerated if an input or the
+        parameter or response definitions have changed since the last run,
+        otherwise just the initial point is updated.  Studies using the
+        numpy `engine` don't run DAKOTA, see :meth:`_sample_points`.
+
+        If `isolated` is set, the run is in a child process, see
+        :meth:`_start_isolated`.  If `persistent_session` is set, the child
+        is kept for later runs, see :meth:`_run_session`.  A child already
+        started by :func:`execute_concurrently` is waited for.
+        """
+        if self._started is not None:
+            handle, self._started = self._started, None
+            self._finish_isolated(handle)
+            return
+        if self.persistent_session:
+            self._isolated_done(self._run_session())
+            return
+        if self._session is not None:
+            self.close_session()
+        if self.isolated:
+            self._finish_isolated(self._start_isolated())
+        else:
+            self._execute()
+
+    def _execute(self):
+        """ Run in this process, see :meth:`execute`. """
+        self._layout = None
+        points = self._sample_points()
+        if points is None:
+            state = self._input_state()
+            if state != self._configured:
+                self._configured = None
+                dakota_input = self.input
+                dakota_input.interface = list(self._interface)
+                self.configure_input()
+                self._configured = state
+            else:
+                for line, positions, kind in self._start_lines:
+                    self.input.variables[line] = \
+                        self._start_point(positions, kind)
+        self._last_point = None
+        self.failures = []
+        self._failed_points = set()
+        self.low_fidelity_evaluations = 0
+        if self.instrument:
+            from dakota_driver.instrument import RunStatistics
+            self._stats = RunStatistics(self.report_interval)
+        decimals = self.cache_decimals if self.cache_decimals >= 0 else None
+        if self.cache_size:
+            from dakota_driver.cache import EvaluationCache
+            self._cache = EvaluationCache(self.cache_size, decimals)
+        if self.evaluation_database:
+            from dakota_driver.database import EvaluationDatabase
+            self._database = EvaluationDatabase(self.evaluation_database,
+                                                self._signature(), decimals)
+        if self.tabular_file:
+            from dakota_driver.tabular import TabularWriter
+            self._tabular = TabularWriter(self.tabular_file,
+                                          self._tabular_columns())
+        try:
+            self._start_run()
+            if points is None:
+                self._run()
+            else:
+                self._run_points(points)
+            # If DAKOTA's last point was served without running the
+            # workflow, run it to leave the same state as an uncached run.
+            if not self._finish_run() and self._last_point is not None:
+                self._evaluate(self._last_point, [1] * len(self._last_asv))
+        finally:
+            stats = self._stats
+            if self._cache is not None:
+                self.cache_hits = self._cache.hits
+                self.cache_misses = self._cache.misses
+                if stats is not None:
+                    stats.cache_hits = self._cache.hits
+                self._cache = None
+            if self._database is not None:
+                self.database_hits = self._database.hits
+                if stats is not None:
+                    stats.database_hits = self._database.hits
+                self._database.close()
+                self._database = None
+            if self._tabular is not None:
+                self._tabular.close()
+                self._tabular = None
+            self._layout = None
+            self._failed_points = set()
+            if self.failures:
+                self._logger.warning('%s', self.failure_summary())
+            if stats is not None:
+                stats.stop()
+                self.run_statistics = stats
+                self._stats = None
+
+    def _start_isolated(self):
+        """
+        Start a run in a child process with its own temporary working
+        directory, returning a handle for :meth:`_finish_isolated`.
+        Relative file names in our inputs refer to the current directory,
+        and ``dakota_tabular.dat`` is copied to it if `tabular_graphics_data`
+        is set.  Other files DAKOTA writes are discarded with the directory.
+        A failure in DAKOTA can then only kill the child.
+        """
+        directory = tempfile.mkdtemp(prefix='dakota_')
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        # Not daemonic so the child can have its own worker pool.
+        proc = multiprocessing.Process(target=self._isolated_child,
+                                       args=(writer, os.getcwd(), directory))
+        try:
+            proc.start()
+        except Exception:
+            shutil.rmtree(directory, True)
+            raise
+        writer.close()
+        return proc, reader, directory
 
-    def set_variables(self, need_start, uniform=False, need_bounds=True):
-        """ Set :class:`DakotaInput` ``variables`` section. """
-        parameters = self.get_parameters()
+    def _isolated_child(self, conn, cwd, directory):
+        """ Run in child process, sending results on `conn`. """
+        try:
+            try:
+                result = self._child_run(cwd, directory)
+            except BaseException:
+                result = ('error', traceback.format_exc())
+            conn.send(result)
+        finally:
+            conn.close()
+
+    def _child_run(self, cwd, directory):
+        """
+        Run in child process working in `directory`, with relative file
+        names referring to `cwd`.  Returns result for :meth:`_isolated_done`.
+        """
+        for name in ('stdout', 'stderr', 'input_file', 'tabular_file',
+                     'evaluation_database'):
+            path = getattr(self, name)
+            if path:
+                setattr(self, name, os.path.join(cwd, path))
+        os.chdir(directory)
+        self._input_dir = directory
+        self._execute()
+        if self.tabular_graphics_data:
+            shutil.copy('dakota_tabular.dat', cwd)
+        outputs = dict((name, getattr(self, name))
+                       for name in self.list_outputs()
+                       if name not in Driver.class_traits())
+        return ('done', outputs, self.run_statistics,
+                self.eval_parameters(self.parent), self._workflow_values())
+
+    def _finish_isolated(self, handle):
+        """
+        Wait for the child process started by :meth:`_start_isolated` and
+        copy its results, see :meth:`_isolated_done`.
+        """
+        proc, conn, directory = handle
+        try:
+            try:
+                result = conn.recv()
+            except EOFError:
+                result = None
+            finally:
+                conn.close()
+                proc.join()
+        finally:
+            shutil.rmtree(directory, True)
+
+        if result is None:
+            self.raise_exception('Isolated DAKOTA process exited with code'
+                                 ' %s' % proc.exitcode, RuntimeError)
+        self._isolated_done(result)
+
+    def _isolated_done(self, result):
+        """
+        Copy outputs of a child process run, and set our workflow to the
+        values it had at the child's final point, leaving the same state as
+        a run in this process without running the workflow again.  Values
+        within sub-assemblies of the workflow aren't copied.
+        """
+        if result[0] == 'error':
+            self.raise_exception('Isolated DAKOTA run failed:\n%s'
+                                 % result[1], RuntimeError)
+
+        kind, outputs, stats, point, values = result
+        for name, value in outputs.items():
+            setattr(self, name, value)
+        self.run_statistics = stats
+        self.set_parameters(point)
+        self._set_workflow_values(values)
+
+    def _run_session(self):
+        """
+        Run in our persistent session process, starting it if there isn't
+        one or the parameter or response definitions or our workflow's
+        components have changed, and return the result.  Our inputs and
+        those of our workflow's components are sent to the session for each
+        run, so it sees any changes made by an outer loop.
+
+        The session saves starting a process and loading the DAKOTA binding
+        for each run, and its configured input is only updated as
+        necessary, see :meth:`execute`.  pyDAKOTA starts a new DAKOTA
+        environment for each run, so DAKOTA still parses the input each
+        time.
+        """
+        components = tuple((name, id(getattr(self.parent, name)))
+                           for name in self.workflow.get_names())
+        key = self._input_state()[1:] + (components,)
+        self._layout = None
+        if self._session is not None:
+            proc, conn, directory, session_key = self._session
+            if session_key != key or not proc.is_alive():
+                self.close_session()
+
+        if self._session is None:
+            directory = tempfile.mkdtemp(prefix='dakota_')
+            conn, child_conn = multiprocessing.Pipe()
+            # Not daemonic so the session can have its own worker pool.
+            proc = multiprocessing.Process(target=self._session_child,
+                                           args=(child_conn, directory))
+            try:
+                proc.start()
+            except Exception:
+                shutil.rmtree(directory, True)
+                raise
+            child_conn.close()
+            self._session = (proc, conn, directory, key)
+            _SESSIONS.add(self)
+
+        proc, conn, directory, key = self._session
+        try:
+            conn.send((os.getcwd(), self._session_state()))
+            return conn.recv()
+        except (EOFError, IOError):
+            self.close_session()
+            self.raise_exception('DAKOTA session process exited with code'
+                                 ' %s' % proc.exitcode, RuntimeError)
+
+    def _session_state(self):
+        """
+        Return our inputs and the inputs of our workflow's components.
+        """
+        inputs = dict((name, getattr(self, name))
+                      for name in self.list_inputs()
+                      if name not in Driver.class_traits())
+        components = []
+        for name in self.workflow.get_names():
+            comp = getattr(self.parent, name)
+            components.append((name, [(var, comp.get(var))
+                                      for var in comp.list_inputs()]))
+        return inputs, components
+
+    def _session_child(self, conn, directory):
+        """ Serve runs requested on `conn` until it's closed. """
+        self._session = None
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    break  # Parent has gone.
+                if request is None:
+                    break
+                cwd, (inputs, components) = request
+                try:
+                    for name, value in inputs.items():
+                        setattr(self, name, value)
+                    for name, values in components:
+                        comp = getattr(self.parent, name)
+                        for var, value in values:
+                            comp.set(var, value, force=True)
+                    result = self._child_run(cwd, directory)
+                except BaseException:
+                    result = ('error', traceback.format_exc())
+                conn.send(result)
+        finally:
+            conn.close()
+
+    def close_session(self):
+        """ Stop any persistent session process. """
+        session, self._session = self._session, None
+        if session is None:
+            return
+        proc, conn, directory, key = session
+        try:
+            conn.send(None)
+        except IOError:
+            pass  # Already exited.
+        conn.close()
+        proc.join(_SESSION_TIMEOUT)
+        if proc.is_alive():
+            proc.terminate()
+            proc.join()
+        shutil.rmtree(directory, True)
+        _SESSIONS.discard(self)
+
+    def _sample_points(self):
+        """
+        Return an iterable of 2-D arrays (chunks) of the points to evaluate
+        if they are generated here rather than by DAKOTA, else None.
+        Overridden by studies with a numpy `engine`.
+        """
+        return None
 
-        if uniform:
-            self.input.variables = [
-                'uniform_uncertain = %s' % self.total_parameters()]
+    def _run_points(self, chunks):
+        """
+        Evaluate `chunks` from :meth:`_sample_points`, recording them as if
+        served to DAKOTA.  If `tabular_graphics_data` is set the points and
+        responses are written to ``dakota_tabular.dat``.  Failed points are
+        only remembered for the current chunk, see :meth:`_points_done`.
+        """
+        layout, n_responses = self._get_layout()
+        out = None
+        if self.tabular_graphics_data:
+            out = open('dakota_tabular.dat', 'w')
+            out.write('%%%s\n' % ' '.join(name.replace(' ', '')
+                                          for name in self._tabular_columns()))
+        try:
+            if self._total_workers() > 1:
+                self._start_scheduler()  # One worker pool for all chunks.
+            next_id = 1
+            for chunk in chunks:
+                ids = range(next_id, next_id + len(chunk))
+                next_id += len(chunk)
+                asv = [[1] * n_responses] * len(chunk)
+                fns = self._serve(chunk, asv, dict(currEvalId=ids))['fns']
+                failed = None
+                if self._failed_points:
+                    failed = array([tuple(point) in self._failed_points
+                                    for point in chunk], dtype=bool)
+                    self._failed_points = set()
+                self._points_done(chunk, fns, failed)
+                if out is not None:
+                    for i, row in enumerate(fns):
+                        out.write('%d %s\n' % (ids[i],
+                                  ' '.join('%.16g' % val for val in
+                                           concatenate((chunk[i], row)))))
+        except Exception:
+            if self._scheduler is not None:
+                self._scheduler.terminate()
+            raise
         else:
-            self.input.variables = [
-                'continuous_design = %s' % self.total_parameters()]
+            if self._scheduler is not None:
+                self._scheduler.close()
+        finally:
+            self._scheduler = None
+            if out is not None:
+                out.close()
+
+    def _points_done(self, points, fns, failed):
+        """
+        Called by :meth:`_run_points` with each chunk of `points` and their
+        responses `fns`, after they have been recorded.  `failed` is a
+        boolean array marking failed points, or None if there were none.
+        """
+        pass
 
-        if need_start:
-            initial = [str(val) for val in self.eval_parameters(dtype=None)]
-            self.input.variables.append(
-                '  initial_point %s' % ' '.join(initial))
+    def _numpy_bounds(self):
+        """
+        Return parameter ``(low, high)`` arrays for the numpy `engine`,
+        which only supports continuous parameters.
+        """
+        kinds, set_values = self._classify_parameters()
+        if any(kind != 'continuous' for kind in kinds):
+            self.raise_exception('Discrete parameters not supported by the'
+                                 ' numpy engine', ValueError)
+        return (array(self.get_lower_bounds(dtype=None), dtype=float),
+                array(self.get_upper_bounds(dtype=None), dtype=float))
+
+    def _run(self):
+        """ Run DAKOTA, in parallel if so configured. """
+        if self._total_workers() > 1 and self._driver_fd:
+            self._start_scheduler()
+            try:
+                self.run_dakota()
+            except Exception:
+                self._scheduler.terminate()
+                raise
+            else:
+                self._scheduler.close()
+            finally:
+                self._scheduler = None
+        elif self._total_workers() > 1 and self._deferrable:
+            self._prefetch()
+            try:
+                self.run_dakota()
+            finally:
+                self._prefetched = {}
+        else:
+            self.run_dakota()
+
+    def _input_state(self):
+        """
+        Return state :meth:`configure_input` depends on, other than the
+        parameters' current values.
+        """
+        inputs = tuple((name, repr(getattr(self, name)))
+                       for name in sorted(self.list_inputs()))
+        params = tuple((tuple(param.names), repr(param.low), repr(param.high))
+                       for param in self.get_parameters().values())
+        layout, n_responses = self._get_layout()
+        responses = tuple((expr.text, stop - start)
+                          for expr, start, stop in layout)
+        return (inputs, params, responses, id(self._low_fidelity))
+
+    def _allow_parameter_types(self, *types):
+        """ Allow parameters of `types` in addition to continuous ones. """
+        for dname in self._delegates_:
+            delegate = getattr(self, dname)
+            if isinstance(delegate, HasParameters):
+                delegate._allowed_types.extend(types)
+                break
+
+    def _start_run(self):
+        """ Called before DAKOTA is run, override to reset run results. """
+        pass
+
+    def _record(self, cv, asv, fns, current):
+        """
+        Called with the function values `fns` of each evaluation returned
+        to DAKOTA.  `current` is True if the workflow is at `cv`.
+        Override to gather results.
+        """
+        pass
+
+    def _finish_run(self):
+        """
+        Called after a successful DAKOTA run, override to set outputs.
+        Returns True if the workflow state has been set, otherwise it is
+        left at DAKOTA's last point.
+        """
+        return False
 
-        if need_bounds:
-            lbounds = [str(val) for val in self.get_lower_bounds(dtype=None)]
-            ubounds = [str(val) for val in self.get_upper_bounds(dtype=None)]
-            self.input.variables.extend([
-                '  lower_bounds %s' % ' '.join(lbounds),
-                '  upper_bounds %s' % ' '.join(ubounds)])
+    def _tabular_columns(self):
+        """ Return column names for `tabular_file`. """
+        return ['eval_id'] + self._parameter_names() + self._response_names()
 
+    def _parameter_names(self):
+        """
+        Return a name for each parameter value, indexed for array
+        parameters.
+        """
+        names = []
+        for param in self.get_parameters().values():
+            name = param.names[0]
+            if param.size > 1:
+                names.extend('%s[%d]' % (name, i) for i in range(param.size))
+            else:
+                names.append(name)
+        return names
+
+    def _response_names(self):
+        """ Return a name for each response value. """
         names = []
-        for param in parameters.values():
-            for name in param.names:
-                names.append('%r' % name)
+        layout, n_responses = self._get_layout()
+        for expr, start, stop in layout:
+            if stop - start == 1:
+                names.append(expr.text)
+            else:
+                names.extend('%s[%d]' % (expr.text, i)
+                             for i in range(stop - start))
+        return names
+
+    def _signature(self):
+        """ Return string identifying the parameters and responses. """
+        names = []
+        for param in self.get_parameters().values():
+            names.extend(param.names)
+        layout, n_responses = self._get_layout()
+        responses = [expr.text for expr, start, stop in layout]
+        return repr((names, responses))
+
+    def _total_workers(self):
+        """ Return number of workers available for parallel evaluation. """
+        if self.broker_address:
+            return self.n_workers + self.remote_workers
+        return self.n_workers
+
+    def _make_pool(self, n_slots=0):
+        """
+        Return pool of workers holding replicas of our parent assembly,
+        local processes or, if `broker_address` is set, a broker pool.
+        Local pools exchange up to `n_slots` points at a time via shared
+        memory if `shared_memory` is set.
+        """
+        if self.broker_address:
+            from dakota_driver.broker import BrokerPool, parse_address
+            pool = BrokerPool(_DriverReplica(self), self.n_workers,
+                              parse_address(self.broker_address),
+                              self.broker_authkey or None,
+                              self.remote_workers)
+            self._logger.info('Evaluation broker listening on %s:%s',
+                              *pool.address)
+            return pool
+        from dakota_driver.parallel import EvaluationPool, SharedSlots
+        slots = None
+        if self.shared_memory and n_slots:
+            layout, n_responses = self._get_layout()
+            slots = SharedSlots(n_slots, self.total_parameters(),
+                                n_responses)
+        return EvaluationPool(_DriverReplica(self), self.n_workers, slots)
+
+    def _start_scheduler(self):
+        """ Start an asynchronous scheduler over the worker pool. """
+        from dakota_driver.parallel import AsyncScheduler
+        concurrency = self.evaluation_concurrency or self._total_workers()
+        self._scheduler = AsyncScheduler(self._make_pool(concurrency),
+                                         concurrency)
+
+    def _prefetch(self):
+        """ Collect DAKOTA's points and evaluate them in parallel. """
+        self._collected = []
+        try:
+            self.run_dakota()
+            collected = self._collected
+        finally:
+            self._collected = None
+
+        points = []
+        asvs = []
+        for cv, asv in collected:
+            if self._database is not None:
+                retval = self._database.get(cv, asv)
+                if retval is not None:
+                    self._prefetched[tuple(cv)] = retval['fns']
+                    continue
+            points.append(cv)
+            asvs.append(asv)
+
+        fns = self.evaluate_batch(points, asvs)
+        for cv, asv, vals in zip(points, asvs, fns):
+            self._prefetched[tuple(cv)] = vals
+            if self._database is not None \
+               and tuple(cv) not in self._failed_points:
+                self._database.put(cv, asv, dict(fns=vals))
 
-        self.input.variables.append(
-            '  descriptors  %s' % ' '.join(names)
-        )
+    def set_variables(self, need_start, uniform=False, need_bounds=True):
+        """
+        Set :class:`DakotaInput` ``variables`` section.  Integer parameters
+        become ``discrete_design_range`` variables, and enumerated ones
+        ``discrete_design_set_integer`` or ``discrete_design_set_real``.
+        """
+        kinds, set_values = self._classify_parameters()
+        if uniform and any(kind != 'continuous' for kind in kinds):
+            self.raise_exception('Discrete parameters not supported',
+                                 ValueError)
+
+        names = ['%r' % name for name in self._parameter_names()]
+
+        self.input.variables = []
+        self._start_lines = []
+        self._int_positions = [i for i, kind in enumerate(kinds)
+                               if kind in ('range', 'integer_set')]
+        self._discrete = any(kind != 'continuous' for kind in kinds)
+        order = []
+        for kind, header in _VARIABLE_SECTIONS:
+            selected = [i for i, val in enumerate(kinds) if val == kind]
+            if not selected:
+                continue
+            order.extend(selected)
+            if kind == 'continuous' and uniform:
+                header = 'uniform_uncertain'
+            self.input.variables.append('%s = %s' % (header, len(selected)))
+
+            # None selects all parameters, the common case.
+            positions = None if len(selected) == len(kinds) else selected
+
+            if need_start:
+                self._start_lines.append((len(self.input.variables),
+                                          positions, kind))
+                self.input.variables.append(self._start_point(positions,
+                                                              kind))
+
+            if kind in ('integer_set', 'real_set'):
+                values = [set_values[i] for i in selected]
+                self.input.variables.extend([
+                    '  num_set_values %s'
+                    % ' '.join(str(len(vals)) for vals in values),
+                    '  set_values %s'
+                    % ' '.join(str(val) for vals in values for val in vals)])
+            elif need_bounds:
+                lbounds = self._select(self.get_lower_bounds(dtype=None),
+                                       positions, kind)
+                ubounds = self._select(self.get_upper_bounds(dtype=None),
+                                       positions, kind)
+                self.input.variables.extend([
+                    '  lower_bounds %s' % ' '.join(lbounds),
+                    '  upper_bounds %s' % ' '.join(ubounds)])
+
+            if positions is not None:
+                descriptors = [names[i] for i in positions]
+            else:
+                descriptors = names
+            self.input.variables.append(
+                '  descriptors  %s' % ' '.join(descriptors)
+            )
+
+        if order == range(len(kinds)):
+            self._var_order = None
+        else:
+            self._var_order = argsort(order)
+
+    def _classify_parameters(self):
+        """
+        Return ``(kinds, set_values)`` for each parameter value, where
+        `kinds` are 'continuous', 'range' (integer), 'integer_set' or
+        'real_set', and `set_values` are the allowed values of a set.
+        """
+        kinds = []
+        set_values = []
+        for param in self.get_parameters().values():
+            vartype = getattr(param, 'vartypename', 'Float')
+            values = None
+            if vartype == 'Enum':
+                values = param.get_metadata('values')[0][1]
+                if all(isinstance(val, (int, long)) for val in values):
+                    kind = 'integer_set'
+                elif all(isinstance(val, (int, long, float))
+                         for val in values):
+                    kind = 'real_set'
+                else:
+                    self.raise_exception('Parameter %s values must be'
+                                         ' numeric' % param.names[0],
+                                         ValueError)
+            elif vartype == 'Int':
+                kind = 'range'
+            else:
+                kind = 'continuous'
+            kinds.extend([kind] * param.size)
+            set_values.extend([values] * param.size)
+        return kinds, set_values
+
+    def _select(self, values, positions, kind='continuous'):
+        """
+        Return strings of `values` at `positions` (all if None), as
+        integers if `kind` isn't continuous.
+        """
+        if positions is not None:
+            values = [values[i] for i in positions]
+        if kind in ('range', 'integer_set'):
+            return [str(int(val)) for val in values]
+        return [str(val) for val in values]
+
+    def _start_point(self, positions=None, kind='continuous'):
+        """
+        Return ``initial_point`` line for current values of the parameters
+        of `kind` at `positions` (all if None).
+        """
+        initial = self._select(self.eval_parameters(dtype=None), positions,
+                               kind)
+        return '  initial_point %s' % ' '.join(initial)
+
+    def _format_point(self, values):
+        """
+        Return strings of `values`, one per parameter value, in DAKOTA's
+        variable order.
+        """
+        strings = [str(val) for val in values]
+        for i in self._int_positions:
+            strings[i] = str(int(values[i]))
+        return self._dakota_order(strings)
+
+    def _dakota_order(self, values):
+        """
+        Return `values`, one per parameter value, in DAKOTA's variable
+        order (continuous, then discrete integer, then discrete real).
+        """
+        if self._var_order is None:
+            return list(values)
+        return [values[i] for i in argsort(self._var_order)]
+
+    def _parameter_values(self, kwargs):
+        """
+        Return DAKOTA's continuous and discrete variable values from
+        callback `kwargs` as a single array in parameter order.
+        """
+        if not self._discrete:
+            return kwargs['cv']
+
+        parts = [array(kwargs.get(name, ()), dtype=float)
+                 for name in ('cv', 'div', 'drv')]
+        if any(part.ndim == 2 for part in parts):
+            n_points = max(len(part) for part in parts)
+            parts = [part.reshape((n_points, -1)) for part in parts]
+            values = concatenate(parts, axis=1)
+            if self._var_order is None:
+                return values
+            return values[:, self._var_order]
+        values = concatenate(parts)
+        if self._var_order is None:
+            return values
+        return values[self._var_order]
 
     def run_dakota(self):
         """
@@ -129,13 +1048,39 @@ class DakotaBase(Driver):
             if self.tabular_graphics_data:
                 self.input.environment.append('tabular_graphics_data')
 
-        infile = self.get_pathname() + '.in'
-        self.input.write_input(infile, data=self)
+        # Rewrite the input file only if it has changed.  The callback
+        # registration made by write_input() is keyed on our id, so remains
+        # valid for a file we wrote earlier.
+        infile = self._input_filename()
+        sections = dict((name, list(lines))
+                        for name, lines in vars(self.input).items()
+                        if isinstance(lines, list))
+        if self._written != (infile, sections) or not os.path.exists(infile):
+            self._written = None
+            self.input.write_input(infile, data=self)
+            self._written = (infile, sections)
+        from dakota import run_dakota
         try:
             run_dakota(infile, stdout=self.stdout, stderr=self.stderr)
         except Exception:
             self.reraise_exception()
 
+    def _input_filename(self):
+        """
+        Return `input_file` or, if that's not set, a file in a private
+        directory so concurrent runs don't collide on the input file.
+        DAKOTA still writes its own files, such as ``dakota.rst``, to the
+        current directory (see `isolated` to avoid that).  The directory
+        is kept until exit so an unchanged input needn't be rewritten.
+        """
+        if self.input_file:
+            return self.input_file
+        if self._input_dir is None or not os.path.isdir(self._input_dir):
+            self._input_dir = tempfile.mkdtemp(prefix='dakota_')
+            _INPUT_DIRS.add(self._input_dir)
+        return os.path.join(self._input_dir,
+                            self.get_pathname().replace('.', '_') + '.in')
+
     def dakota_callback(self, **kwargs):
         """
         Return responses from parameters.  `kwargs` contains:
@@ -170,47 +1115,687 @@ class DakotaBase(Driver):
         currEvalId current evaluation ID number
         ========== ==============================================
 
+        If `cv` is two-dimensional it's a block of evaluations (one row per
+        point, with a matching row of `asv` for each).  The block is
+        evaluated via :meth:`evaluate_batch` and ``fns`` is returned as a
+        2-D array, one row of responses per point.  DAKOTA's direct Python
+        interface only passes single points, blocks come from the numpy
+        `engine` of studies (see :meth:`_run_points`).  Parallel evaluation
+        of DAKOTA's points is by collecting them first, see :meth:`execute`.
+        """
+        return self._serve(self._parameter_values(kwargs), kwargs['asv'],
+                           kwargs)
+
+    def _serve(self, cv, asv, kwargs):
+        """
+        Return responses for :meth:`dakota_callback` given `cv` in
+        parameter order.
         """
-        cv = kwargs['cv']
-        asv = kwargs['asv']
         self._logger.debug('cv %s', cv)
         self._logger.debug('asv %s', asv)
 
-        self.set_parameters(cv)
-        self.run_iteration()
+        if self._collected is not None:
+            # Just recording points, responses are ignored.
+            if ndim(cv) == 2:
+                self._collected.extend(zip(array(cv, dtype=float), asv))
+                fns = zeros((len(cv), kwargs['functions']))
+            else:
+                self._collected.append((array(cv, dtype=float), asv))
+                fns = zeros(kwargs['functions'])
+            return dict(fns=fns)
+
+        if _LOW_FIDELITY in kwargs.get('analysis_components', ()):
+            if ndim(cv) == 2:
+                fns = array([self._evaluate_low_fidelity(cv[i], asv[i])
+                             for i in range(len(cv))])
+            else:
+                fns = self._evaluate_low_fidelity(cv, asv)
+            return dict(fns=fns)
+
+        stats = self._stats
+        if stats is not None:
+            start = time()
+
+        if ndim(cv) == 2:
+            retval = dict(fns=self._serve_batch(cv, asv))
+            if self._tabular is not None:
+                ids = kwargs.get('currEvalId', self._tabular.rows + 1)
+                if ndim(ids) == 0:
+                    ids = range(ids, ids + len(cv))
+                for i, row in enumerate(retval['fns']):
+                    self._tabular.write_row(ids[i], cv[i], row)
+            for i, row in enumerate(retval['fns']):
+                if tuple(cv[i]) not in self._failed_points:
+                    self._record(cv[i], asv[i], row, False)
+        else:
+            retval = self._lookup(cv, asv)
+            if retval is None:
+                retval, ok = self._respond_safe(cv, asv)
+                if ok:
+                    if self._cache is not None:
+                        self._cache.put(cv, asv, retval)
+                    if self._database is not None:
+                        self._database.put(cv, asv, retval)
+                    self._record(cv, asv, retval['fns'], True)
+                self._last_point = None
+            else:
+                self._last_point = cv
+                self._last_asv = asv
+                if tuple(cv) not in self._failed_points:
+                    self._record(cv, asv, retval['fns'], False)
+            if self._tabular is not None:
+                self._tabular.write_row(kwargs.get('currEvalId',
+                                                   self._tabular.rows + 1),
+                                        cv, retval['fns'])
+
+        if stats is not None:
+            now = time()
+            stats.record('callback', now - start)
+            if stats.evaluation_done(now, len(cv) if ndim(cv) == 2 else 1):
+                self._logger.info('%s', stats.progress())
+
+        self._logger.debug('returning %s', retval)
+        return retval
+
+    def _serve_batch(self, cv, asv):
+        """
+        Return 2-D array of responses for the rows of `cv`.  As for single
+        points, responses are looked up in the cache and evaluation database
+        first, and new ones are stored there.  The rest are evaluated via
+        :meth:`evaluate_batch`.  If the workflow isn't left at the last row,
+        it's noted to be run there at the end of the run.
+        """
+        fns = [None] * len(cv)
+        missing = []
+        for i in range(len(cv)):
+            retval = self._lookup(cv[i], asv[i])
+            if retval is None:
+                missing.append(i)
+            else:
+                fns[i] = retval['fns']
+
+        if missing:
+            points = array([cv[i] for i in missing], dtype=float)
+            vals = self.evaluate_batch(points, [asv[i] for i in missing])
+            for i, row in zip(missing, vals):
+                fns[i] = row
+                if tuple(cv[i]) in self._failed_points:
+                    continue
+                if self._cache is not None:
+                    self._cache.put(cv[i], asv[i], dict(fns=row))
+                if self._database is not None:
+                    self._database.put(cv[i], asv[i], dict(fns=row))
+
+        # Evaluated here, rather than by workers, only as in _evaluate_batch.
+        local = self._scheduler is None \
+                and (self._total_workers() <= 1 or len(missing) <= 1)
+        if local and missing and missing[-1] == len(cv) - 1:
+            self._last_point = None
+        else:
+            self._last_point = cv[-1]
+            self._last_asv = asv[-1]
+        return array(fns)
+
+    def evaluate_batch(self, points, asv=None):
+        """
+        Evaluate each row of `points` and return a 2-D array of responses,
+        one row per point.  `asv` may be a single active set vector applied
+        to every point or one row per point.  By default only function
+        values are requested.  If there is more than one worker (see
+        `n_workers` and `broker_address`) the points are shared among worker
+        processes, each evaluating a replica of the parent assembly.
+        """
+        if self._layout is not None:
+            return self._evaluate_batch(points, asv)
 
+        # Not within execute(), response layout is only valid for this call.
+        try:
+            return self._evaluate_batch(points, asv)
+        finally:
+            self._layout = None
+
+    def _evaluate_batch(self, points, asv):
+        """ Evaluate `points`, see :meth:`evaluate_batch`. """
+        n_points = len(points)
+        layout, n_responses = self._get_layout()
+        if asv is None:
+            asv = [1] * n_responses
+
+        if self._scheduler is not None:
+            return self._schedule_batch(self._scheduler, points, asv)
+
+        if self._total_workers() > 1 and n_points > 1:
+            if self.failure_action == 'abort':
+                n_slots = min(n_points, _MAX_SLOTS)
+            else:
+                n_slots = self.evaluation_concurrency or self._total_workers()
+            pool = self._make_pool(n_slots)
+            try:
+                if self.failure_action == 'abort':
+                    fns = pool.evaluate(points, asv)
+                else:
+                    # Need to know which points failed.
+                    from dakota_driver.parallel import AsyncScheduler
+                    scheduler = AsyncScheduler(pool,
+                                               self.evaluation_concurrency)
+                    fns = self._schedule_batch(scheduler, points, asv)
+            except Exception:
+                pool.terminate()
+                raise
+            pool.close()
+            return fns
+
+        if ndim(asv) == 1:
+            asv = [asv] * n_points
+
+        fns = empty((n_points, n_responses))
+        for i in range(n_points):
+            try:
+                self._evaluate_retry(points[i], asv[i], fns[i])
+            except Exception as exc:
+                if self.failure_action == 'abort':
+                    raise
+                self._failed(points[i], exc, fns[i])
+        return fns
+
+    def _schedule_batch(self, scheduler, points, asv):
+        """ Evaluate `points` via `scheduler`, see :meth:`evaluate_batch`. """
+        n_points = len(points)
+        layout, n_responses = self._get_layout()
+        if ndim(asv) == 1:
+            asv = [asv] * n_points
+        index = dict((scheduler.submit(points[i], asv[i]), i)
+                     for i in range(n_points))
+        fns = empty((n_points, n_responses))
+        for ticket, exc, vals in scheduler.as_completed(errors=True):
+            i = index[ticket]
+            if exc is None:
+                fns[i] = vals
+            elif self.failure_action == 'abort':
+                raise exc
+            else:
+                self._failed(points[i], exc, fns[i])
+        return fns
+
+    def _respond_safe(self, cv, asv):
+        """
+        Return ``(response, ok)`` for `cv` and `asv`, retrying failed
+        evaluations and applying `failure_action` if retries are exhausted.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return (self._respond(cv, asv), True)
+            except NotImplementedError:
+                raise  # Configuration error, not an evaluation failure.
+            except Exception as exc:
+                if attempt < self.max_retries:
+                    self._logger.warning('Evaluation at %s failed (%s),'
+                                         ' retrying', list(cv), exc)
+                    continue
+                if self.failure_action == 'abort':
+                    raise
+                exc._dakota_traceback = traceback.format_exc()
+                fns = self._failed(cv, exc)
+
+        retval = dict(fns=fns)
+        fill = nan if self.failure_action == 'nan' else 0.
+        n_vars = len(cv)
+        if any(bits & 2 for bits in asv):
+            retval['fnGrads'] = zeros((len(fns), n_vars)) + fill
+        if any(bits & 4 for bits in asv):
+            retval['fnHessians'] = zeros((len(fns), n_vars, n_vars)) + fill
+        return (retval, False)
+
+    def _evaluate_retry(self, cv, asv, out=None):
+        """
+        :meth:`_evaluate` `cv`, retrying up to `max_retries` times.
+        The last exception is re-raised with its formatted traceback.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._evaluate(cv, asv, out)
+            except Exception as exc:
+                if attempt < self.max_retries:
+                    self._logger.warning('Evaluation at %s failed (%s),'
+                                         ' retrying', list(cv), exc)
+                    continue
+                exc._dakota_traceback = traceback.format_exc()
+                raise
+
+    def _failed(self, cv, exc, out=None):
+        """
+        Record failure `exc` evaluating `cv` and return the responses given
+        by `failure_action` (in `out` if given).
+        """
+        self.failures.append((list(cv), str(exc),
+                              getattr(exc, '_dakota_traceback', '')))
+        self._failed_points.add(tuple(cv))
+        if out is None:
+            layout, n_responses = self._get_layout()
+            out = empty(n_responses)
+        out[:] = nan if self.failure_action == 'nan' else self.penalty_value
+        return out
+
+    def failure_summary(self):
+        """ Return description of evaluations in `failures`. """
+        lines = ['%d evaluations failed' % len(self.failures)]
+        for point, message, trace in self.failures:
+            lines.append('  %s: %s' % (point, message))
+        return '\n'.join(lines)
+
+    def _get_expressions(self):
+        """ Return response expressions in DAKOTA order. """
         expressions = self.get_objectives().values()
         if hasattr(self, 'get_eq_constraints'):
             expressions.extend(self.get_eq_constraints().values())
         if hasattr(self, 'get_ineq_constraints'):
             expressions.extend(self.get_ineq_constraints().values())
+        return expressions
 
-        fns = []
-        for i, expr in enumerate(expressions):
-            if asv[i] & 1:
+    def _get_layout(self):
+        """
+        Return ``(layout, n_responses)``, where `layout` is a list of
+        ``(expression, start, stop)`` giving each response expression's
+        slice of the DAKOTA response vector.  Computed once per run.
+        """
+        if self._layout is None:
+            layout = []
+            start = 0
+            for expr in self._get_expressions():
                 val = expr.evaluate(self.parent)
-                if isinstance(val, list):
-                    fns.extend(val)
-                else:
-                    fns.append(val)
-            if asv[i] & 2:
-                self.raise_exception('Gradients not supported yet',
-                                     NotImplementedError)
-            if asv[i] & 4:
+                stop = start + (len(val) if isinstance(val, list) else 1)
+                layout.append((expr, start, stop))
+                start = stop
+            self._layout = (layout, start)
+        return self._layout
+
+    def _lookup(self, cv, asv):
+        """
+        Return response dictionary for `cv` and `asv` if it is available
+        without running the workflow, else None.
+        """
+        if self._prefetched:
+            fns = self._prefetched.get(tuple(cv))
+            if fns is not None:
+                return dict(fns=fns)
+        if self._cache is not None:
+            retval = self._cache.get(cv, asv)
+            if retval is not None:
+                return retval
+        if self._database is not None:
+            retval = self._database.get(cv, asv)
+            if retval is not None and self._cache is not None:
+                self._cache.put(cv, asv, retval)
+            return retval
+        return None
+
+    def _respond(self, cv, asv):
+        """ Return DAKOTA response dictionary for `cv` and `asv`. """
+        need_grads = any(bits & 2 for bits in asv)
+        if need_grads and self._driver_fd and self._scheduler is not None:
+            fns, grads = self._fd_gradients(cv, asv)
+            return dict(fns=fns, fnGrads=grads)
+
+        hessians = None
+        if any(bits & 4 for bits in asv):
+            if not self._analytic_hessians:
                 self.raise_exception('Hessians not supported yet',
                                      NotImplementedError)
+            # Before evaluating at cv, since this may perturb the workflow.
+            hessians = self.calc_hessians(cv)
 
-        retval = dict(fns=array(fns))
-        self._logger.debug('returning %s', retval)
+        retval = dict(fns=self._evaluate(cv, asv))
+        if need_grads:
+            if not self._analytic_gradients:
+                self.raise_exception('Gradients not supported yet',
+                                     NotImplementedError)
+            retval['fnGrads'] = self._workflow_gradients()
+        if hessians is not None:
+            retval['fnHessians'] = hessians
         return retval
 
+    def _workflow_gradients(self):
+        """
+        Return gradients of all responses with respect to the parameters,
+        one row per response, using the workflow's derivative machinery
+        (component-provided derivatives where available, else finite
+        differences of the components).
+        """
+        inputs = self.list_param_group_targets()
+        outputs = ['%s.out0' % expr.pcomp_name
+                   for expr, start, stop in self._get_layout()[0]]
+        return array(self.workflow.calc_gradient(inputs, outputs))
+
+    def _fd_gradients(self, cv, asv):
+        """
+        Return function values and finite difference gradients at `cv`.
+        The perturbed points are handed to the scheduler, keeping the
+        workers busy, while the center point is evaluated here (which also
+        leaves the workflow at `cv`).
+        """
+        step_size, interval_type = self._driver_fd
+        cv = array(cv, dtype=float)
+        lower = self.get_lower_bounds()
+        upper = self.get_upper_bounds()
+        steps = step_size * maximum(abs(cv), 0.01)
+        fn_asv = [1] * len(asv)
+
+        stencil = []  # (variable index, step, tickets)
+        for i, step in enumerate(steps):
+            if interval_type == 'central' and \
+               lower[i] <= cv[i] - step and cv[i] + step <= upper[i]:
+                deltas = (step, -step)
+            elif cv[i] + step <= upper[i]:
+                deltas = (step,)
+            else:
+                deltas = (-step,)
+            tickets = []
+            for delta in deltas:
+                point = cv.copy()
+                point[i] += delta
+                tickets.append(self._scheduler.submit(point, fn_asv))
+            stencil.append((i, deltas[0], tickets))
+
+        fns = self._evaluate(cv, fn_asv)
+        results = dict(self._scheduler.as_completed())
+
+        grads = zeros((len(fns), len(cv)))
+        for i, step, tickets in stencil:
+            if len(tickets) == 2:
+                grads[:, i] = (results[tickets[0]] - results[tickets[1]]) \
+                              / (2 * step)
+            else:
+                grads[:, i] = (results[tickets[0]] - fns) / step
+        return fns, grads
+
+    def _evaluate(self, cv, asv, out=None):
+        """
+        Run the workflow at `cv` and return function values requested by
+        `asv` (others are zero).  Values are written into `out` if given.
+        """
+        cv = self._typed(cv)
+        stats = self._stats
+        if stats is None:
+            self.set_parameters(cv)
+            self.run_iteration()
+        else:
+            began = time()
+            self.set_parameters(cv)
+            params_done = time()
+            self.run_iteration()
+            run_done = time()
+            stats.record('set_parameters', params_done - began)
+            stats.record('run_iteration', run_done - params_done)
+
+        layout, n_responses = self._get_layout()
+        fns = zeros(n_responses) if out is None else out
+        scope = self.parent
+        for expr, start, stop in layout:
+            if asv[start] & 1:
+                fns[start:stop] = expr.evaluate(scope)
+            elif out is not None:
+                fns[start:stop] = 0.
+
+        if stats is not None:
+            stats.record('responses', time() - run_done)
+        return fns
+
+    def _evaluate_low_fidelity(self, cv, asv):
+        """
+        Run the low-fidelity model at `cv` and return function values
+        requested by `asv` (others are zero).
+        """
+        if any(bits & 6 for bits in asv):
+            self.raise_exception('Low fidelity derivatives not supported',
+                                 NotImplementedError)
+        self.low_fidelity_evaluations += 1
+        scope = self._low_fidelity
+        self.set_parameters(self._typed(cv), scope=scope)
+        scope.run()
+
+        layout, n_responses = self._get_layout()
+        fns = zeros(n_responses)
+        for expr, start, stop in layout:
+            if asv[start] & 1:
+                fns[start:stop] = expr.evaluate(scope)
+        return fns
+
+    def _workflow_values(self):
+        """
+        Return copies of the input and output values of our workflow's
+        components, for :meth:`_set_workflow_values`.
+        """
+        framework = Component.class_traits()
+        values = []
+        for name in self.workflow.get_names():
+            comp = getattr(self.parent, name)
+            names = [var for var in comp.list_inputs() + comp.list_outputs()
+                     if var not in framework]
+            values.append((name, [(var, deepcopy(comp.get(var)))
+                                  for var in names]))
+        return values
+
+    def _set_workflow_values(self, values):
+        """
+        Restore values from :meth:`_workflow_values` without running the
+        workflow.
+        """
+        for name, pairs in values:
+            comp = getattr(self.parent, name)
+            for var, value in pairs:
+                comp.set(var, value, force=True)
+
+    def _typed(self, cv):
+        """ Return `cv` with values of integer parameters as ints. """
+        if not self._int_positions:
+            return cv
+        cv = list(cv)
+        for i in self._int_positions:
+            cv[i] = int(round(cv[i]))
+        return cv
+
+
+def execute_concurrently(drivers):
+    """
+    Execute independent `drivers` at the same time, each in its own child
+    process as if `isolated` were set.  Typically these are the drivers of
+    separate assemblies, such as one study per design variant.  All the
+    children are started, then each driver is run as usual, its
+    :meth:`execute` waiting for its child.  The drivers' inputs must be
+    set beforehand.  At most one driver may have `tabular_graphics_data`
+    set, since they would all write ``dakota_tabular.dat``.  The first
+    error raised is re-raised after all have finished.
+    """
+    drivers = list(drivers)
+    if sum(driver.tabular_graphics_data for driver in drivers) > 1:
+        raise ValueError('Concurrent drivers would overwrite'
+                         ' dakota_tabular.dat')
+    for driver in drivers:
+        driver.check_config()
+    error = None
+    try:
+        for driver in drivers:
+            driver.close_session()
+            driver._started = driver._start_isolated()
+        for driver in drivers:
+            try:
+                driver.run(force=True)
+            except Exception as exc:
+                error = error or exc
+    finally:
+        # Children not waited for by a run, after an error.
+        for driver in drivers:
+            handle, driver._started = driver._started, None
+            if handle is not None:
+                proc, conn, directory = handle
+                conn.close()
+                proc.terminate()
+                proc.join()
+                shutil.rmtree(directory, True)
+    if error is not None:
+        raise error
+
+
+class _DriverReplica(object):
+    """
+    Picklable evaluator for worker processes.  Holds a copy of the driver's
+    parent assembly and evaluates points with the copy's driver.
+    """
+
+    def __init__(self, driver):
+        self.assembly = driver.parent
+        self.name = driver.name
+
+    def __call__(self, point, asv):
+        driver = getattr(self.assembly, self.name)
+        driver._stats = None  # Timing is only collected by the parent.
+        return driver._evaluate_retry(point, asv)
+
 
 class DakotaOptimizer(DakotaBase):
-    """ Base class for optimizers using the DAKOTA Python interface. """
-    # Currently only a 'marker' class.
+    """
+    Base class for optimizers using the DAKOTA Python interface.
+    Provides the gradient and Hessian settings of the ``responses`` section.
+    """
 
     implements(IOptimizer)
 
+    fd_gradient_step_size = Float(1.e-5, low=1.e-10, iotype='in',
+                                  desc='Relative step size for gradients')
+    interval_type = Enum(values=('forward', 'central'), iotype='in',
+                         desc='Type of finite difference for gradients')
+    gradients = Enum('numerical', values=('numerical', 'analytic'),
+                     iotype='in',
+                     desc="Gradient source, 'analytic' uses the workflow's"
+                          " derivatives")
+    hessians = Enum('none', values=('none', 'analytic', 'bfgs', 'sr1'),
+                    iotype='in',
+                    desc="Hessian source, 'analytic' uses calc_hessians(),"
+                         " 'bfgs' and 'sr1' are DAKOTA quasi-Newton updates")
+    fd_hessian_step_size = Float(1.e-4, low=1.e-10, iotype='in',
+                                 desc='Relative step size for default'
+                                      ' calc_hessians()')
+    restore_best = Bool(False, iotype='in',
+                        desc='Leave workflow at best point found rather than'
+                             " at DAKOTA's last evaluation, restoring the"
+                             ' values it had there')
+    best_point = Array(iotype='out', desc='Best parameter values found')
+    best_objective = Float(iotype='out', desc='Objective at best_point')
+    best_responses = Array(iotype='out',
+                           desc='All response values at best_point')
+
+    def _start_run(self):
+        """ Reset best point tracking. """
+        layout, n_responses = self._get_layout()
+        n_objectives = len(self.get_objectives())
+        n_eq = len(self.get_eq_constraints()) \
+               if hasattr(self, 'get_eq_constraints') else 0
+        self._obj_stop = layout[n_objectives - 1][2]
+        self._eq_stop = layout[n_objectives + n_eq - 1][2]
+        self._best = None  # (rank, cv, fns, workflow values or None)
+        self._at_best = False
+
+    def _record(self, cv, asv, fns, current):
+        """ Update best point if `fns` is complete and better. """
+        if current:
+            self._at_best = False
+        if not all(bits & 1 for bits in asv):
+            return
+        violation = abs(fns[self._obj_stop:self._eq_stop]).sum() \
+                    + maximum(fns[self._eq_stop:], 0.).sum()
+        if violation <= getattr(self, 'constraint_tolerance', 0.):
+            violation = 0.
+        rank = (violation, fns[0])
+        if self._best is None or rank < self._best[0]:
+            values = None
+            if current and self.restore_best:
+                values = self._workflow_values()
+            self._best = (rank, array(cv, dtype=float), array(fns), values)
+            self._at_best = current
+
+    def _finish_run(self):
+        """
+        Set best point outputs, optionally restoring the workflow from the
+        values recorded there.  The workflow is only rerun if the best
+        point's responses came from elsewhere (a cache, the evaluation
+        database or a worker process).
+        """
+        if self._best is None:
+            return False
+        rank, cv, fns, values = self._best
+        self._best = None
+        self.best_point = cv
+        self.best_objective = fns[0]
+        self.best_responses = fns
+        if not self.restore_best:
+            return False
+        if not self._at_best:
+            if values is None:
+                self._evaluate(cv, [1] * len(fns))
+            else:
+                self.set_parameters(self._typed(cv))
+                self._set_workflow_values(values)
+        return True
+
+    def derivative_responses(self):
+        """
+        Return ``responses`` section lines for gradients and Hessians, and
+        record how :meth:`dakota_callback` is to compute them.
+        """
+        self._analytic_gradients = self.gradients == 'analytic'
+        if not self._analytic_gradients and self._total_workers() > 1:
+            # Compute the stencil ourselves, concurrently.
+            self._driver_fd = (self.fd_gradient_step_size, self.interval_type)
+        else:
+            self._driver_fd = None
+
+        if self._analytic_gradients or self._driver_fd:
+            lines = ['analytic_gradients']
+        else:
+            lines = [
+                'numerical_gradients',
+                '  method_source dakota',
+                '  interval_type %s' % self.interval_type,
+                '  fd_gradient_step_size = %s' % self.fd_gradient_step_size]
+
+        self._analytic_hessians = self.hessians == 'analytic'
+        if self._analytic_hessians:
+            lines.append('  analytic_hessians')
+        elif self.hessians == 'none':
+            lines.append('  no_hessians')
+        else:
+            lines.append('  quasi_hessians %s' % self.hessians)
+        return lines
+
+    def calc_hessians(self, cv):
+        """
+        Return Hessians of all responses at `cv`, shaped
+        (responses, parameters, parameters).  This default uses central
+        differences of the workflow's gradients; override to supply
+        analytic Hessians.  The workflow may be left at a perturbed point.
+        """
+        cv = array(cv, dtype=float)
+        lower = self.get_lower_bounds()
+        upper = self.get_upper_bounds()
+        steps = self.fd_hessian_step_size * maximum(abs(cv), 0.01)
+
+        hessians = None
+        for i, step in enumerate(steps):
+            high = cv.copy()
+            high[i] = min(cv[i] + step, upper[i])
+            low = cv.copy()
+            low[i] = max(cv[i] - step, lower[i])
+            grads = []
+            for point in (high, low):
+                self.set_parameters(point)
+                self.run_iteration()
+                grads.append(self._workflow_gradients())
+            column = (grads[0] - grads[1]) / (high[i] - low[i])
+            if hessians is None:
+                hessians = zeros((len(column), len(cv), len(cv)))
+            hessians[:, :, i] = column
+        return 0.5 * (hessians + hessians.transpose(0, 2, 1))
+
 
 @add_delegate(HasIneqConstraints)
 class DakotaCONMIN(DakotaOptimizer):
@@ -226,10 +1811,6 @@ class DakotaCONMIN(DakotaOptimizer):
                                   desc='Convergence tolerance')
     constraint_tolerance = Float(1.e-7, low=1.e-10, iotype='in',
                                  desc='Constraint tolerance')
-    fd_gradient_step_size = Float(1.e-5, low=1.e-10, iotype='in',
-                                  desc='Relative step size for gradients')
-    interval_type = Enum(values=('forward', 'central'), iotype='in',
-                         desc='Type of finite difference for gradients')
 
     def __init__(self):
         super(DakotaCONMIN, self).__init__()
@@ -261,13 +1842,232 @@ class DakotaCONMIN(DakotaOptimizer):
             self.input.responses.append(
                 'nonlinear_inequality_constraints = %s' % ineq_constraints)
 
-        self.input.responses.extend([
-            'numerical_gradients',
-            '  method_source dakota',
-            '  interval_type %s' % self.interval_type,
-            '  fd_gradient_step_size = %s' % self.fd_gradient_step_size,
-            '  no_hessians',
-        ])
+        self.input.responses.extend(self.derivative_responses())
+
+
+@add_delegate(HasIneqConstraints)
+class DakotaNewton(DakotaOptimizer):
+    """
+    OPT++ Newton optimizer using DAKOTA.  Requires Hessians, by default
+    DAKOTA's BFGS quasi-Newton approximation.
+    """
+
+    implements(IHasIneqConstraints)
+
+    max_iterations = Int(100, low=1, iotype='in',
+                         desc='Max number of iterations to execute')
+    max_function_evaluations = Int(1000, low=1, iotype='in',
+                                   desc='Max number of function evaluations')
+    convergence_tolerance = Float(1.e-7, low=1.e-10, iotype='in',
+                                  desc='Convergence tolerance')
+    hessians = Enum('bfgs', values=('none', 'analytic', 'bfgs', 'sr1'),
+                    iotype='in',
+                    desc="Hessian source, 'analytic' uses calc_hessians(),"
+                         " 'bfgs' and 'sr1' are DAKOTA quasi-Newton updates")
+
+    def __init__(self):
+        super(DakotaNewton, self).__init__()
+        # DakotaOptimizer leaves _max_objectives at 0 (unlimited).
+        self._hasobjectives._max_objectives = 1
+
+    def configure_input(self):
+        """ Configures input specification. """
+        if self.hessians == 'none':
+            self.raise_exception('optpp_newton requires hessians', ValueError)
+
+        objectives = self.get_objectives()
+        ineq_constraints = self.total_ineq_constraints()
+
+        self.input.method = [
+            'optpp_newton',
+            '  output = %s' % self.output,
+            '  max_iterations = %s' % self.max_iterations,
+            '  max_function_evaluations = %s' % self.max_function_evaluations,
+            '  convergence_tolerance = %s' % self.convergence_tolerance]
+
+        self.set_variables(need_start=True)
+
+        self.input.responses = [
+            'objective_functions = %s' % len(objectives)]
+
+        if ineq_constraints:
+            self.input.responses.append(
+                'nonlinear_inequality_constraints = %s' % ineq_constraints)
+
+        self.input.responses.extend(self.derivative_responses())
+
+
+@add_delegate(HasIneqConstraints)
+class DakotaSurrogateOptimizer(DakotaOptimizer):
+    """
+    Surrogate-based optimizer using DAKOTA, for expensive workflows.
+    'efficient_global' is DAKOTA's EGO, which builds its own Gaussian process
+    model.  'surrogate_based_local' optimizes a global `surrogate` of the
+    workflow (fit to `samples` LHS samples) with `approx_method` within a
+    trust region, refitting as the trust region moves.  If a low-fidelity
+    model has been set (see :meth:`set_low_fidelity`) it is used as the
+    surrogate instead, corrected to match the workflow at the trust region
+    center.  The gradient and Hessian settings apply to the surrogate.
+    """
+
+    implements(IHasIneqConstraints)
+
+    method = Enum('efficient_global',
+                  values=('efficient_global', 'surrogate_based_local'),
+                  iotype='in', desc='DAKOTA surrogate-based method')
+    surrogate = Enum('gaussian_process',
+                     values=sorted(_SURROGATES), iotype='in',
+                     desc="Surrogate type for 'surrogate_based_local'")
+    approx_method = Enum('conmin_mfd',
+                         values=('conmin_mfd', 'optpp_q_newton'), iotype='in',
+                         desc="Optimizer of the surrogate for"
+                              " 'surrogate_based_local'")
+    samples = Int(0, low=0, iotype='in',
+                  desc="Samples the surrogate is built from for"
+                       " 'surrogate_based_local', 0 for DAKOTA's default")
+    trust_region_size = Float(0.1, low=1.e-6, high=1., iotype='in',
+                              desc='Initial trust region size, relative to'
+                                   ' the parameter bounds')
+    seed = Int(52983, iotype='in', desc='Seed for random number generator')
+    max_iterations = Int(20, low=1, iotype='in',
+                         desc='Max number of iterations (surrogate updates)')
+    max_function_evaluations = \
+             Int(100, low=1, iotype='in',
+                 desc='Max number of workflow evaluations')
+    convergence_tolerance = Float(1.e-4, low=1.e-10, iotype='in',
+                                  desc='Convergence tolerance')
+    constraint_tolerance = Float(1.e-4, low=1.e-10, iotype='in',
+                                 desc='Constraint tolerance')
+
+    _multifidelity = True
+
+    def __init__(self):
+        super(DakotaSurrogateOptimizer, self).__init__()
+        # DakotaOptimizer leaves _max_objectives at 0 (unlimited).
+        self._hasobjectives._max_objectives = 1
+
+    def configure_input(self):
+        """ Configures input specification. """
+        objectives = self.get_objectives()
+        ineq_constraints = self.total_ineq_constraints()
+
+        self.set_variables(need_start=True)
+
+        self.input.responses = [
+            'objective_functions = %s' % len(objectives)]
+        if ineq_constraints:
+            self.input.responses.append(
+                'nonlinear_inequality_constraints = %s' % ineq_constraints)
+
+        self.input.environment = [line for line in self.input.environment
+                                  if 'top_method_pointer' not in line]
+        if self.method == 'efficient_global':
+            if self._low_fidelity is not None:
+                self.raise_exception('efficient_global does not use a low'
+                                     ' fidelity model', ValueError)
+            self.input.method = [
+                'efficient_global',
+                '  output = %s' % self.output,
+                '  seed = %s' % self.seed,
+                '  max_iterations = %s' % self.max_iterations,
+                '  max_function_evaluations = %s'
+                % self.max_function_evaluations,
+                '  convergence_tolerance = %s' % self.convergence_tolerance]
+            self.input.model = ['single']
+            self._analytic_gradients = False
+            self._analytic_hessians = False
+            self._driver_fd = None
+            self.input.responses.extend(['no_gradients', 'no_hessians'])
+            return
+
+        # Top-level method, surrogate optimizer, and surrogate build.
+        self.input.environment.append("top_method_pointer = 'SBLO'")
+        self.input.method = [
+            "id_method = 'SBLO'",
+            'surrogate_based_local',
+            "  model_pointer = 'SURROGATE'",
+            "  approx_method_pointer = 'APPROX'",
+            '  output = %s' % self.output,
+            '  max_iterations = %s' % self.max_iterations,
+            '  max_function_evaluations = %s' % self.max_function_evaluations,
+            '  convergence_tolerance = %s' % self.convergence_tolerance,
+            '  trust_region',
+            '    initial_size = %s' % self.trust_region_size,
+            'method',
+            "id_method = 'APPROX'",
+            self.approx_method,
+            '  output = %s' % self.output,
+            '  convergence_tolerance = %s' % self.convergence_tolerance]
+        if ineq_constraints and self.approx_method == 'conmin_mfd':
+            self.input.method.append(
+                '  constraint_tolerance = %s' % self.constraint_tolerance)
+        self.input.responses.extend(self.derivative_responses())
+
+        if self._low_fidelity is not None:
+            self.input.model = self._hierarchical_model('SURROGATE')
+            return
+
+        self.input.method.extend([
+            'method',
+            "id_method = 'SAMPLING'",
+            "model_pointer = 'TRUTH'",
+            'sampling',
+            '  output = %s' % self.output,
+            '  sample_type lhs',
+            '  seed = %s' % self.seed])
+        if self.samples:
+            self.input.method.append('  samples = %s' % self.samples)
+
+        self.input.model = [
+            "id_model = 'SURROGATE'",
+            'surrogate global',
+            '  %s' % _SURROGATES[self.surrogate],
+            "  dace_method_pointer = 'SAMPLING'",
+            'model',
+            "id_model = 'TRUTH'",
+            'single']
+
+
+class DakotaMultilevelSampling(DakotaBase):
+    """
+    Multilevel Monte Carlo sampling using DAKOTA.  Most samples are of the
+    low-fidelity model set by :meth:`set_low_fidelity`, with the workflow
+    sampled to correct their statistics.
+    """
+
+    pilot_samples = Int(20, low=2, iotype='in',
+                        desc='Initial samples of each model')
+    seed = Int(52983, iotype='in', desc='Seed for random number generator')
+    convergence_tolerance = Float(0.01, low=1.e-10, iotype='in',
+                                  desc='Target relative accuracy of the'
+                                       ' estimated means')
+
+    _multifidelity = True
+
+    def configure_input(self):
+        """ Configures input specification. """
+        if self._low_fidelity is None:
+            self.raise_exception('Low fidelity model not set', ValueError)
+
+        objectives = self.get_objectives()
+
+        self.input.model = self._hierarchical_model()
+        self.input.method = [
+            "model_pointer = 'HIERARCH'",
+            'multilevel_sampling',
+            '  output = %s' % self.output,
+            '  pilot_samples = %s' % self.pilot_samples,
+            '  seed = %s' % self.seed,
+            '  convergence_tolerance = %s' % self.convergence_tolerance]
+
+        self.set_variables(need_start=False, uniform=True)
+
+        names = ['%r' % name for name in objectives.keys()]
+        self.input.responses = [
+            'num_response_functions = %s' % len(objectives),
+            'response_descriptors = %s' % ' '.join(names),
+            'no_gradients',
+            'no_hessians']
 
 
 class DakotaMultidimStudy(DakotaBase):
@@ -275,15 +2075,39 @@ class DakotaMultidimStudy(DakotaBase):
 
     partitions = List(Int, low=1, iotype='in',
                       desc='List giving # of partitions for each parameter')
+    engine = Enum('dakota', iotype='in', values=('dakota', 'numpy'),
+                  desc="'numpy' generates all points without running DAKOTA,"
+                       " continuous parameters only")
 
-    def configure_input(self):
-        """ Configures input specification. """
+    _deferrable = True
+
+    def __init__(self):
+        super(DakotaMultidimStudy, self).__init__()
+        self._allow_parameter_types('discrete', 'enum')
+
+    def _check_partitions(self):
+        """ Verify there's a partition count for each parameter. """
         if len(self.partitions) != self.total_parameters():
             self.raise_exception('#partitions (%s) != #parameters (%s)'
                                  % (len(self.partitions), self.total_parameters()),
                                  ValueError)
 
-        partitions = [str(partition) for partition in self.partitions]
+    def _sample_points(self):
+        """ Return grid points if using the numpy `engine`. """
+        if self.engine != 'numpy':
+            return None
+        from dakota_driver.sampling import grid_points
+        self._check_partitions()
+        low, high = self._numpy_bounds()
+        return _chunks(grid_points(low, high, self.partitions))
+
+    def configure_input(self):
+        """ Configures input specification. """
+        self._check_partitions()
+        self.set_variables(need_start=False)
+
+        partitions = self._dakota_order([str(partition)
+                                         for partition in self.partitions])
         objectives = self.get_objectives()
 
         self.input.method = [
@@ -291,8 +2115,6 @@ class DakotaMultidimStudy(DakotaBase):
             '  output = %s' % self.output,
             '  partitions = %s' % ' '.join(partitions)]
 
-        self.set_variables(need_start=False)
-
         self.input.responses = [
             'objective_functions = %s' % len(objectives),
             'no_gradients',
@@ -306,24 +2128,44 @@ class DakotaVectorStudy(DakotaBase):
                        desc='List of final parameter values')
     num_steps = Int(1, low=1, iotype='in',
                     desc='Number of steps along path to evaluate')
+    engine = Enum('dakota', iotype='in', values=('dakota', 'numpy'),
+                  desc="'numpy' generates all points without running DAKOTA,"
+                       " continuous parameters only")
+
+    _deferrable = True
 
     def __init__(self):
         super(DakotaVectorStudy, self).__init__()
-        for dname in self._delegates_:
-            delegate = getattr(self, dname)
-            if isinstance(delegate, HasParameters):
-                delegate._allowed_types.append('unbounded')
-                break
+        self._allow_parameter_types('unbounded', 'discrete', 'enum')
 
-    def configure_input(self):
-        """ Configures the input specification. """
+    def _check_final_point(self):
+        """ Verify there's a final value for each parameter. """
         n_params = self.total_parameters()
         if len(self.final_point) != n_params:
             self.raise_exception('#final_point (%s) != #parameters (%s)'
                                  % (len(self.final_point), n_params),
                                  ValueError)
 
-        final_point = [str(point) for point in self.final_point]
+    def _sample_points(self):
+        """
+        Return points along the vector if using the numpy `engine`.  Both
+        engines start from the parameters' current values.
+        """
+        if self.engine != 'numpy':
+            return None
+        from dakota_driver.sampling import vector_points
+        self._check_final_point()
+        self._numpy_bounds()
+        start = array(self.eval_parameters(dtype=None), dtype=float)
+        return _chunks(vector_points(start, self.final_point,
+                                          self.num_steps))
+
+    def configure_input(self):
+        """ Configures the input specification. """
+        self._check_final_point()
+        self.set_variables(need_start=True, need_bounds=False)
+
+        final_point = self._format_point(self.final_point)
         objectives = self.get_objectives()
 
         self.input.method = [
@@ -332,8 +2174,6 @@ class DakotaVectorStudy(DakotaBase):
             '  final_point = %s' % ' '.join(final_point),
             '  num_steps = %s' % self.num_steps]
 
-        self.set_variables(need_start=False, need_bounds=False)
-
         self.input.responses = [
             'objective_functions = %s' % len(objectives),
             'no_gradients',
@@ -347,9 +2187,112 @@ class DakotaGlobalSAStudy(DakotaBase):
                        desc='Type of sampling')
     seed = Int(52983, iotype='in', desc='Seed for random number generator')
     samples = Int(100, iotype='in', low=1, desc='# of samples to evaluate')
+    engine = Enum('dakota', iotype='in', values=('dakota', 'numpy'),
+                  desc="'numpy' generates all points without running DAKOTA,"
+                       " continuous parameters only")
+    sobol = Bool(False, iotype='in',
+                 desc='Estimate Sobol indices by pick-freeze sampling,'
+                      ' samples * (#parameters + 2) evaluations,'
+                      ' numpy engine only')
+
+    means = Array(iotype='out', desc='Mean of each response')
+    std_deviations = Array(iotype='out',
+                           desc='Standard deviation of each response')
+    correlations = Array(iotype='out',
+                         desc='Simple correlation coefficient of each'
+                              ' (parameter, response) pair')
+    sobol_first = Array(iotype='out',
+                        desc='First order Sobol index of each'
+                             ' (parameter, response) pair')
+    sobol_total = Array(iotype='out',
+                        desc='Total Sobol index of each'
+                             ' (parameter, response) pair')
+
+    _deferrable = True
+
+    def _sample_points(self):
+        """ Return uniform samples if using the numpy `engine`. """
+        if self.engine != 'numpy':
+            return None
+        from dakota_driver.sampling import lhs_points, random_points, \
+                                           pick_freeze_blocks
+        low, high = self._numpy_bounds()
+        generate = lhs_points if self.sample_type == 'lhs' else random_points
+        if not self.sobol:
+            return _chunks(generate(low, high, self.samples, self.seed))
+        return pick_freeze_blocks(low, high, self.samples, self.seed,
+                                  _CHUNK_POINTS, generate)
+
+    def _start_run(self):
+        """
+        Reset statistics accumulators, and outputs so they're empty if too
+        few samples succeed.
+        """
+        from dakota_driver.stats import RunningCorrelation, SobolIndices
+        for name in ('means', 'std_deviations', 'correlations',
+                     'sobol_first', 'sobol_total'):
+            setattr(self, name, zeros(0))
+        layout, n_responses = self._get_layout()
+        n_params = self.total_parameters()
+        self._moments = RunningCorrelation(n_params, n_responses)
+        self._sobol = None
+        if self.sobol:
+            self._sobol = SobolIndices(n_params, n_responses)
+            self._pending = None
+
+    def _record(self, cv, asv, fns, current):
+        """ Update statistics with sample. """
+        if self._sobol is None:
+            self._moments.add(cv, fns)
+
+    def _points_done(self, points, fns, failed):
+        """
+        Update statistics with complete pick-freeze samples, skipping any
+        with failed evaluations.  An incomplete sample at the end of the
+        chunk is kept for the next one.
+        """
+        if self._sobol is None:
+            return
+        if failed is None:
+            failed = zeros(len(points), dtype=bool)
+        if self._pending is not None:
+            points = concatenate((self._pending[0], points))
+            fns = concatenate((self._pending[1], fns))
+            failed = concatenate((self._pending[2], failed))
+        n_params = points.shape[1]
+        size = n_params + 2
+        complete = len(points) // size * size
+        self._pending = (points[complete:].copy(), fns[complete:].copy(),
+                         failed[complete:].copy())
+
+        points = points[:complete].reshape((-1, size, n_params))
+        fns = fns[:complete].reshape((-1, size, fns.shape[1]))
+        ok = ~failed[:complete].reshape((-1, size)).any(axis=1)
+        points = points[ok]
+        fns = fns[ok]
+        self._moments.add(points[:, 0], fns[:, 0])
+        self._moments.add(points[:, 1], fns[:, 1])
+        self._sobol.add(fns[:, 0], fns[:, 1], fns[:, 2:])
+
+    def _finish_run(self):
+        """ Set statistics outputs. """
+        moments = self._moments
+        if moments.count >= 2:
+            self.means = moments.y.mean.copy()
+            self.std_deviations = moments.y.std()
+            self.correlations = moments.correlation()
+            if self._sobol is not None:
+                self.sobol_first = self._sobol.first_order()
+                self.sobol_total = self._sobol.total()
+        self._moments = None
+        self._sobol = None
+        return False
 
     def configure_input(self):
         """ Configures input specification. """
+        if self.sobol:
+            self.raise_exception('Sobol indices require the numpy engine',
+                                 ValueError)
         objectives = self.get_objectives()
 
         self.input.method = [
@@ -0,0 +1,140 @@
+"""
+Per-phase counters and timers for DAKOTA driver runs.
+"""
+
+import time
+
+from math import floor, log10
+
+__all__ = ['RunStatistics']
+
+# Histogram buckets per decade of seconds used to estimate percentiles,
+# giving about 1% resolution.
+_BUCKETS_PER_DECADE = 100
+
+# Times below this are counted in the lowest bucket.
+_MIN_SECONDS = 1.e-9
+
+
+class RunStatistics(object):
+    """
+    Timing statistics for one run.  Phases are recorded via :meth:`record`,
+    typically ``callback`` (total time in the DAKOTA callback),
+    ``set_parameters``, ``run_iteration`` and ``responses``.
+    Time spent in DAKOTA itself is the run's elapsed time less the
+    ``callback`` time.
+
+    Each phase keeps only its count, total, minimum, maximum and a
+    histogram with logarithmic buckets, from which the 95th percentile is
+    estimated.  Memory use doesn't grow with the number of evaluations.
+
+    If `report_interval` is nonzero, :meth:`evaluation_done` returns True
+    at most once per `report_interval` seconds, to drive a progress log.
+    """
+
+    def __init__(self, report_interval=0.):
+        self.report_interval = report_interval
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.database_hits = 0
+        self.elapsed = 0.
+        self.times = {}  # Phase -> [count, total, min, max, histogram].
+        self._start = time.time()
+        self._next_report = self._start + report_interval
+
+    def record(self, phase, seconds):
+        """ Record `seconds` spent in `phase`. """
+        bucket = int(floor(log10(max(seconds, _MIN_SECONDS))
+                           * _BUCKETS_PER_DECADE))
+        try:
+            times = self.times[phase]
+        except KeyError:
+            self.times[phase] = [1, seconds, seconds, seconds, {bucket: 1}]
+        else:
+            times[0] += 1
+            times[1] += seconds
+            if seconds < times[2]:
+                times[2] = seconds
+            if seconds > times[3]:
+                times[3] = seconds
+            histogram = times[4]
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+
+    def evaluation_done(self, now, count=1):
+        """
+        Count `count` evaluations completed at time `now`, returning True
+        if a progress report is due.
+        """
+        self.evaluations += count
+        if self.report_interval and now >= self._next_report:
+            self._next_report = now + self.report_interval
+            return True
+        return False
+
+    def stop(self):
+        """ Record end of run. """
+        self.elapsed = time.time() - self._start
+
+    def phase_summary(self, phase):
+        """
+        Return dictionary with ``count``, and ``total``, ``mean``, ``min``,
+        ``max`` and (estimated) ``p95`` seconds for `phase`.
+        """
+        if phase not in self.times:
+            return dict(count=0, total=0., mean=0., min=0., max=0., p95=0.)
+        count, total, low, high, histogram = self.times[phase]
+        return dict(count=count, total=total, mean=total / count,
+                    min=low, max=high,
+                    p95=self._percentile(histogram, count, 0.95, low, high))
+
+    @staticmethod
+    def _percentile(histogram, count, fraction, low, high):
+        """
+        Return estimate of the `fraction` percentile (nearest rank) from
+        `histogram` of `count` times between `low` and `high`.
+        """
+        rank = max(int(round(fraction * count)), 1)
+        seen = 0
+        for bucket in sorted(histogram):
+            seen += histogram[bucket]
+            if seen >= rank:
+                break
+        estimate = 10.**((bucket + 0.5) / _BUCKETS_PER_DECADE)
+        return min(max(estimate, low), high)
+
+    def summary(self):
+        """ Return statistics as a dictionary. """
+        phases = dict((phase, self.phase_summary(phase))
+                      for phase in self.times)
+        callback = phases.get('callback', dict(total=0.))['total']
+        elapsed = self.elapsed or (time.time() - self._start)
+        return dict(evaluations=self.evaluations,
+                    cache_hits=self.cache_hits,
+                    database_hits=self.database_hits,
+                    elapsed=elapsed,
+                    dakota=max(elapsed - callback, 0.),
+                    phases=phases)
+
+    def progress(self):
+        """ Return one-line progress report. """
+        elapsed = time.time() - self._start
+        callback = self.phase_summary('callback')
+        return '%d evaluations in %.3g s, mean callback %.3g s' \
+               % (self.evaluations, elapsed, callback['mean'])
+
+    def __str__(self):
+        summary = self.summary()
+        lines = ['evaluations %d, cache hits %d, database hits %d'
+                 % (summary['evaluations'], summary['cache_hits'],
+                    summary['database_hits']),
+                 'elapsed %.6g s, in DAKOTA %.6g s'
+                 % (summary['elapsed'], summary['dakota']),
+                 '%-15s %8s %12s %12s %12s %12s %12s'
+                 % ('phase', 'count', 'total', 'mean', 'min', 'max', 'p95')]
+        for phase in sorted(summary['phases']):
+            stats = summary['phases'][phase]
+            lines.append('%-15s %8d %12.6g %12.6g %12.6g %12.6g %12.6g'
+                         % (phase, stats['count'], stats['total'],
+                            stats['mean'], stats['min'], stats['max'],
+                            stats['p95']))
+        return '\n'.join(lines)
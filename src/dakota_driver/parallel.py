@@ -0,0 +1,264 @@
+"""
+Parallel evaluation support for the DAKOTA drivers.
+
+An `evaluator` is any picklable callable taking ``(point, asv)`` and returning
+an array of responses.  Each worker process unpickles its own copy of the
+evaluator (typically a replica of the driver's parent assembly), so workers
+share no state with the parent or with each other.
+
+Points, active set vectors and responses may be exchanged via
+:class:`SharedSlots`, shared memory set up when the pool is created, so
+tasks only carry slot numbers rather than pickled arrays.
+"""
+
+import cPickle
+import multiprocessing
+import Queue
+
+from collections import deque
+from multiprocessing.sharedctypes import RawArray
+
+from numpy import empty, frombuffer, int32, ndim
+
+__all__ = ['EvaluationPool', 'AsyncScheduler', 'SharedSlots']
+
+# Evaluator and SharedSlots held by a worker process.
+_EVALUATOR = None
+_SLOTS = None
+
+
+class SharedSlots(object):
+    """
+    Shared memory for `n_slots` evaluations of `n_vars` variables and
+    `n_responses` responses.  Must be created before the worker processes
+    so they inherit it.  :attr:`points`, :attr:`asv` and :attr:`fns` are
+    arrays with one row per slot.
+    """
+
+    def __init__(self, n_slots, n_vars, n_responses):
+        self.n_slots = n_slots
+        self._raw = (RawArray('d', n_slots * n_vars),
+                     RawArray('i', n_slots * n_responses),
+                     RawArray('d', n_slots * n_responses))
+        self._setup(n_vars, n_responses)
+
+    def _setup(self, n_vars, n_responses):
+        """ Create array views of shared memory. """
+        points, asv, fns = self._raw
+        self.points = frombuffer(points).reshape((self.n_slots, n_vars))
+        self.asv = frombuffer(asv, dtype=int32).reshape((self.n_slots,
+                                                         n_responses))
+        self.fns = frombuffer(fns).reshape((self.n_slots, n_responses))
+
+
+def _init_worker(state, slots=None):
+    """ Unpickle this worker's copy of the evaluator. """
+    global _EVALUATOR, _SLOTS
+    _EVALUATOR = cPickle.loads(state)
+    _SLOTS = slots
+
+
+def _run_task(task):
+    """ Evaluate one point in a worker. """
+    index, point, asv = task
+    return index, _EVALUATOR(point, asv)
+
+
+def _run_task_safe(task):
+    """ Evaluate one point in a worker, returning any exception raised. """
+    index, point, asv = task
+    try:
+        return index, None, _EVALUATOR(point, asv)
+    except Exception as exc:
+        return index, exc, None
+
+
+def _run_slots(task):
+    """
+    Evaluate shared slots ``first`` up to ``last`` in a worker, returning
+    ``(first, last, errors)`` where `errors` is a list of
+    ``(slot, exception)``.
+    """
+    first, last = task
+    errors = []
+    for slot in range(first, last):
+        try:
+            _SLOTS.fns[slot] = _EVALUATOR(_SLOTS.points[slot],
+                                          _SLOTS.asv[slot])
+        except Exception as exc:
+            errors.append((slot, exc))
+    return first, last, errors
+
+
+class EvaluationPool(object):
+    """
+    Pool of `n_workers` processes, each holding its own copy of `evaluator`.
+    If `slots` (a :class:`SharedSlots`) is given, points and responses are
+    exchanged through it.
+    """
+
+    def __init__(self, evaluator, n_workers, slots=None):
+        state = cPickle.dumps(evaluator, cPickle.HIGHEST_PROTOCOL)
+        self.n_workers = n_workers
+        self.slots = slots
+        self._free = deque(range(slots.n_slots)) if slots else deque()
+        self._pool = multiprocessing.Pool(n_workers, _init_worker,
+                                          (state, slots))
+
+    def evaluate(self, points, asv):
+        """
+        Evaluate each row of `points` and return a 2-D array of responses,
+        one row per point.  `asv` may be a single active set vector or one
+        row per point.
+        """
+        n_points = len(points)
+        if ndim(asv) == 1:
+            asv = [asv] * n_points
+        if self.slots is not None and n_points:
+            return self._evaluate_slots(points, asv)
+
+        tasks = [(i, points[i], asv[i]) for i in range(n_points)]
+        chunksize = max(1, n_points // (4 * self.n_workers))
+
+        fns = None
+        for i, vals in self._pool.imap_unordered(_run_task, tasks, chunksize):
+            if fns is None:
+                fns = empty((n_points, len(vals)))
+            fns[i] = vals
+        if fns is None:
+            fns = empty((0, 0))
+        return fns
+
+    def _evaluate_slots(self, points, asv):
+        """ :meth:`evaluate` via shared slots, `n_slots` points at a time. """
+        slots = self.slots
+        n_points = len(points)
+        fns = empty((n_points, slots.fns.shape[1]))
+        for start in range(0, n_points, slots.n_slots):
+            stop = min(start + slots.n_slots, n_points)
+            count = stop - start
+            slots.points[:count] = points[start:stop]
+            slots.asv[:count] = asv[start:stop]
+            chunksize = max(1, count // (4 * self.n_workers))
+            tasks = [(first, min(first + chunksize, count))
+                     for first in range(0, count, chunksize)]
+            for first, last, errors in self._pool.imap_unordered(_run_slots,
+                                                                 tasks):
+                if errors:
+                    raise errors[0][1]
+            fns[start:stop] = slots.fns[:count]
+        return fns
+
+    def apply_async(self, task, callback):
+        """
+        Start evaluating `task` ``(index, point, asv)``.  When done,
+        `callback` is called (from a pool thread) with
+        ``(index, exception, responses)``.
+        """
+        try:
+            slot = self._free.popleft()
+        except IndexError:  # No shared slots free.
+            self._pool.apply_async(_run_task_safe, (task,),
+                                   callback=callback)
+            return
+
+        index, point, asv = task
+        self.slots.points[slot] = point
+        self.slots.asv[slot] = asv
+
+        def done(result):
+            first, last, errors = result
+            if errors:
+                retval = (index, errors[0][1], None)
+            else:
+                retval = (index, None, self.slots.fns[slot].copy())
+            self._free.append(slot)
+            callback(retval)
+
+        self._pool.apply_async(_run_slots, ((slot, slot + 1),),
+                               callback=done)
+
+    def close(self):
+        """ Shut down the worker processes. """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def terminate(self):
+        """ Stop the worker processes without waiting for pending work. """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+class AsyncScheduler(object):
+    """
+    Keeps up to `concurrency` evaluations in flight on an
+    :class:`EvaluationPool`.  New points are accepted while earlier ones are
+    still running, and results are returned in completion order.
+    If `concurrency` is zero the pool's worker count is used.
+    """
+
+    def __init__(self, pool, concurrency=0):
+        self.pool = pool
+        self.concurrency = concurrency or pool.n_workers
+        self._done = Queue.Queue()
+        self._pending = deque()
+        self._in_flight = 0
+        self._next_ticket = 0
+
+    @property
+    def in_flight(self):
+        """ Number of evaluations submitted but not yet returned. """
+        return self._in_flight + len(self._pending)
+
+    def submit(self, point, asv):
+        """ Queue `point` for evaluation, returning its ticket. """
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        self._pending.append((ticket, point, asv))
+        self._dispatch()
+        return ticket
+
+    def next_completed(self, errors=False):
+        """
+        Wait for an evaluation to finish and return ``(ticket, responses)``.
+        An exception raised by the evaluation is re-raised here, unless
+        `errors` is True, in which case ``(ticket, exception, responses)``
+        is returned with one of `exception` or `responses` None.
+        """
+        if not self.in_flight:
+            raise RuntimeError('No evaluations in flight')
+        ticket, exc, vals = self._done.get()
+        self._in_flight -= 1
+        self._dispatch()
+        if errors:
+            return ticket, exc, vals
+        if exc is not None:
+            raise exc
+        return ticket, vals
+
+    def as_completed(self, errors=False):
+        """
+        Generate results of :meth:`next_completed` until nothing is in
+        flight.
+        """
+        while self.in_flight:
+            yield self.next_completed(errors)
+
+    def close(self):
+        """ Shut down the pool. """
+        self.pool.close()
+
+    def terminate(self):
+        """ Stop the pool without waiting for evaluations in flight. """
+        self._pending.clear()
+        self.pool.terminate()
+
+    def _dispatch(self):
+        """ Start pending evaluations up to the concurrency limit. """
+        while self._pending and self._in_flight < self.concurrency:
+            self._in_flight += 1
+            self.pool.apply_async(self._pending.popleft(), self._done.put)
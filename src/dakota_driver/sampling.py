@@ -0,0 +1,106 @@
+"""
+Vectorized generation of parameter study and sampling points.
+
+These provide the points of DAKOTA's ``multidim_parameter_study``,
+``vector_parameter_study`` and uniform ``sampling`` methods as a 2-D array
+(one row per point) so a study can be evaluated without running DAKOTA.
+Grid and vector points are in DAKOTA's order, random samples are from
+numpy's generator so don't match DAKOTA's for the same seed.
+:func:`pick_freeze_points` arranges samples for estimating Sobol indices,
+and :func:`pick_freeze_blocks` generates them a block at a time.
+"""
+
+from numpy import arange, array, asarray, empty, indices, linspace, outer
+from numpy.random import RandomState
+
+__all__ = ['grid_points', 'vector_points', 'lhs_points', 'random_points',
+           'pick_freeze_points', 'pick_freeze_blocks']
+
+
+def grid_points(low, high, partitions):
+    """
+    Return points of a grid from `low` to `high` with `partitions`
+    intervals per variable.  The first variable varies fastest.
+    """
+    axes = [linspace(lo, hi, n + 1)
+            for lo, hi, n in zip(low, high, partitions)]
+    shape = [len(axis) for axis in axes]
+    index = indices(shape[::-1]).reshape((len(shape), -1))[::-1]
+    return array([axis[i] for axis, i in zip(axes, index)]).T
+
+
+def vector_points(start, final, num_steps):
+    """
+    Return `num_steps` + 1 equally spaced points from `start` to `final`.
+    """
+    start = asarray(start, dtype=float)
+    final = asarray(final, dtype=float)
+    return start + outer(arange(num_steps + 1) / float(num_steps),
+                         final - start)
+
+
+def _random_state(seed):
+    """ Return `seed` if it's a :class:`RandomState`, else a new one. """
+    if isinstance(seed, RandomState):
+        return seed
+    return RandomState(seed)
+
+
+def lhs_points(low, high, samples, seed=None):
+    """
+    Return `samples` Latin hypercube samples uniformly distributed from
+    `low` to `high`.  `seed` may be a :class:`RandomState` to continue.
+    """
+    low = asarray(low, dtype=float)
+    high = asarray(high, dtype=float)
+    random = _random_state(seed)
+    strata = array([random.permutation(samples) for i in range(len(low))]).T
+    fraction = (strata + random.uniform(size=strata.shape)) / samples
+    return low + fraction * (high - low)
+
+
+def random_points(low, high, samples, seed=None):
+    """
+    Return `samples` random samples uniformly distributed from `low` to
+    `high`.  `seed` may be a :class:`RandomState` to continue.
+    """
+    low = asarray(low, dtype=float)
+    high = asarray(high, dtype=float)
+    random = _random_state(seed)
+    return low + random.uniform(size=(samples, len(low))) * (high - low)
+
+
+def pick_freeze_points(a, b):
+    """
+    Return points for pick-freeze estimation of Sobol indices from base
+    samples `a` and `b`.  For each sample there are ``n_params + 2``
+    consecutive points: the row of `a`, the row of `b`, then the row of `a`
+    with each parameter in turn taken from `b`.
+    """
+    a = asarray(a, dtype=float)
+    b = asarray(b, dtype=float)
+    n_samples, n_params = a.shape
+    points = empty((n_samples, n_params + 2, n_params))
+    points[:, 0] = a
+    points[:, 1] = b
+    for i in range(n_params):
+        points[:, i + 2] = a
+        points[:, i + 2, i] = b[:, i]
+    return points.reshape((n_samples * (n_params + 2), n_params))
+
+
+def pick_freeze_blocks(low, high, samples, seed=None, block_points=1024,
+                       generate=lhs_points):
+    """
+    Generate :func:`pick_freeze_points` for `samples` base samples from
+    `low` to `high` as 2-D arrays of at most about `block_points` points.
+    Base samples are drawn by `generate` (:func:`lhs_points` or
+    :func:`random_points`) separately for each block, so only one block is
+    in memory at a time.
+    """
+    random = _random_state(seed)
+    per_block = max(1, block_points // (len(low) + 2))
+    for start in range(0, samples, per_block):
+        count = min(per_block, samples - start)
+        base = generate(low, high, 2 * count, random)
+        yield pick_freeze_points(base[:count], base[count:])
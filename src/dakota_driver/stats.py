@@ -0,0 +1,134 @@
+"""
+Streaming statistics of sampling study responses.
+
+Each accumulator is updated with blocks of rows as evaluations complete and
+uses memory independent of the number of rows: moments via Welford's
+method (combined block-wise as by Chan et al.), correlations via running
+co-moments, and Sobol indices via pick-freeze estimators.
+"""
+
+from numpy import asarray, atleast_2d, errstate, nan, outer, sqrt, zeros
+
+__all__ = ['RunningMoments', 'RunningCorrelation', 'SobolIndices']
+
+
+class RunningMoments(object):
+    """ Mean and variance of each of `n` columns. """
+
+    def __init__(self, n):
+        self.count = 0
+        self.mean = zeros(n)
+        self.m2 = zeros(n)  # Sum of squared deviations from the mean.
+
+    def add(self, rows):
+        """ Update with `rows`, a 2-D array or a single row. """
+        rows = atleast_2d(asarray(rows, dtype=float))
+        n_rows = len(rows)
+        if not n_rows:
+            return
+        mean = rows.mean(axis=0)
+        delta = mean - self.mean
+        total = self.count + n_rows
+        self.m2 += ((rows - mean)**2).sum(axis=0) \
+                 + delta**2 * (self.count * n_rows / float(total))
+        self.mean += delta * (n_rows / float(total))
+        self.count = total
+
+    def variance(self, ddof=1):
+        """ Return variance of each column, NaN if too few rows. """
+        if self.count <= ddof:
+            return zeros(len(self.mean)) + nan
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=1):
+        """ Return standard deviation of each column. """
+        return sqrt(self.variance(ddof))
+
+
+class RunningCorrelation(object):
+    """
+    Moments of `n_x` and `n_y` columns, and the correlation coefficient of
+    each ``(x, y)`` pair.
+    """
+
+    def __init__(self, n_x, n_y):
+        self.x = RunningMoments(n_x)
+        self.y = RunningMoments(n_y)
+        self.cxy = zeros((n_x, n_y))  # Sum of products of deviations.
+
+    @property
+    def count(self):
+        """ Number of rows added. """
+        return self.x.count
+
+    def add(self, x_rows, y_rows):
+        """ Update with corresponding `x_rows` and `y_rows`. """
+        x_rows = atleast_2d(asarray(x_rows, dtype=float))
+        y_rows = atleast_2d(asarray(y_rows, dtype=float))
+        n_rows = len(x_rows)
+        if not n_rows:
+            return
+        x_mean = x_rows.mean(axis=0)
+        y_mean = y_rows.mean(axis=0)
+        scale = self.count * n_rows / float(self.count + n_rows)
+        self.cxy += (x_rows - x_mean).T.dot(y_rows - y_mean) \
+                  + outer(x_mean - self.x.mean, y_mean - self.y.mean) * scale
+        self.x.add(x_rows)
+        self.y.add(y_rows)
+
+    def correlation(self):
+        """
+        Return ``(n_x, n_y)`` array of correlation coefficients, NaN where
+        a column has no variance.
+        """
+        with errstate(divide='ignore', invalid='ignore'):
+            return self.cxy / sqrt(outer(self.x.m2, self.y.m2))
+
+
+class SobolIndices(object):
+    """
+    First order and total Sobol indices of `n_responses` responses with
+    respect to `n_params` parameters.  Updated with pick-freeze samples:
+    responses at base points A and B and at A with each parameter in turn
+    taken from B (see :func:`dakota_driver.sampling.pick_freeze_points`).
+    Uses the estimators of Saltelli et al. (2010) for first order and
+    Jansen (1999) for total indices.
+    """
+
+    def __init__(self, n_params, n_responses):
+        self.moments = RunningMoments(n_responses)
+        self.count = 0
+        self._first = zeros((n_params, n_responses))
+        self._total = zeros((n_params, n_responses))
+        self._shift = None
+
+    def add(self, f_a, f_b, f_ab):
+        """
+        Update with responses `f_a` and `f_b` (one row per sample), and
+        `f_ab` (per sample, one row per parameter).
+        """
+        f_a = atleast_2d(asarray(f_a, dtype=float))
+        f_b = atleast_2d(asarray(f_b, dtype=float))
+        f_ab = asarray(f_ab, dtype=float).reshape((len(f_a),) +
+                                                   self._first.shape)
+        if not len(f_a):
+            return
+        if self._shift is None:
+            # Reduces round-off for responses with a large mean.
+            self._shift = f_a.mean(axis=0)
+        diff = f_ab - f_a[:, None, :]
+        self._first += ((f_b - self._shift)[:, None, :] * diff).sum(axis=0)
+        self._total += 0.5 * (diff**2).sum(axis=0)
+        self.count += len(f_a)
+        self.moments.add(f_a)
+        self.moments.add(f_b)
+
+    def first_order(self):
+        """ Return ``(n_params, n_responses)`` first order indices. """
+        with errstate(divide='ignore', invalid='ignore'):
+            return self._first / self.count / self.moments.variance()
+
+    def total(self):
+        """ Return ``(n_params, n_responses)`` total indices. """
+        with errstate(divide='ignore', invalid='ignore'):
+            return self._total / self.count / self.moments.variance()
@@ -0,0 +1,125 @@
+"""
+Compact binary tabular storage of evaluations.
+
+A file consists of a short header giving the column names, followed by
+rows of little-endian float64 values appended as evaluations complete.
+Rows are buffered and written in chunks, and a reader can process files of
+any size chunk by chunk (:func:`iter_tabular`) or map them into memory
+(:func:`load_tabular`) without parsing text.
+"""
+
+import json
+import struct
+
+from numpy import dtype, empty, fromfile, memmap
+
+__all__ = ['TabularWriter', 'read_columns', 'iter_tabular', 'load_tabular']
+
+_MAGIC = 'DKTAB1\n'
+_DTYPE = dtype('<f8')
+
+
+class TabularWriter(object):
+    """
+    Writes rows with `columns` to `filename`, buffering `chunk_rows` rows
+    between writes.  Rows are visible to readers after :meth:`flush` or
+    :meth:`close`.
+    """
+
+    def __init__(self, filename, columns, chunk_rows=1024):
+        self.filename = filename
+        self.columns = list(columns)
+        self.rows = 0
+        self._buffer = empty((chunk_rows, len(self.columns)), dtype=_DTYPE)
+        self._used = 0
+        header = json.dumps(dict(columns=self.columns))
+        self._out = open(filename, 'wb')
+        self._out.write(_MAGIC)
+        self._out.write(struct.pack('<I', len(header)))
+        self._out.write(header)
+
+    def write_row(self, *parts):
+        """
+        Append one row made of the concatenated `parts` (scalars or
+        sequences), for example ``(eval_id, cv, fns)``.
+        """
+        row = self._buffer[self._used]
+        start = 0
+        for part in parts:
+            if hasattr(part, '__len__'):
+                stop = start + len(part)
+                row[start:stop] = part
+            else:
+                stop = start + 1
+                row[start] = part
+            start = stop
+        if start != len(self.columns):
+            raise ValueError('Row has %d values, expected %d'
+                             % (start, len(self.columns)))
+        self._used += 1
+        self.rows += 1
+        if self._used == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        """ Write buffered rows. """
+        if self._used:
+            self._buffer[:self._used].tofile(self._out)
+            self._used = 0
+        self._out.flush()
+
+    def close(self):
+        """ Write buffered rows and close the file. """
+        if self._out is not None:
+            self.flush()
+            self._out.close()
+            self._out = None
+
+
+def _read_header(inp):
+    """ Return column names from open file `inp`, positioned at the data. """
+    if inp.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError('%s is not a tabular evaluation file' % inp.name)
+    size, = struct.unpack('<I', inp.read(4))
+    return json.loads(inp.read(size))['columns']
+
+
+def read_columns(filename):
+    """ Return column names of `filename`. """
+    with open(filename, 'rb') as inp:
+        return _read_header(inp)
+
+
+def iter_tabular(filename, chunk_rows=65536):
+    """
+    Generate 2-D arrays of up to `chunk_rows` rows from `filename`.
+    A partially written final row is ignored.
+    """
+    with open(filename, 'rb') as inp:
+        n_cols = len(_read_header(inp))
+        while True:
+            data = fromfile(inp, dtype=_DTYPE, count=chunk_rows * n_cols)
+            rows = len(data) // n_cols
+            if not rows:
+                break
+            yield data[:rows * n_cols].reshape((rows, n_cols))
+            if rows < chunk_rows:
+                break
+
+
+def load_tabular(filename):
+    """
+    Return ``(columns, data)`` for `filename`, where `data` is a read-only
+    memory-mapped 2-D array with one row per evaluation.
+    """
+    with open(filename, 'rb') as inp:
+        columns = _read_header(inp)
+        offset = inp.tell()
+        inp.seek(0, 2)
+        size = inp.tell() - offset
+    rows = size // (_DTYPE.itemsize * len(columns))
+    if not rows:
+        return columns, empty((0, len(columns)), dtype=_DTYPE)
+    data = memmap(filename, dtype=_DTYPE, mode='r', offset=offset,
+                  shape=(rows, len(columns)))
+    return columns, data
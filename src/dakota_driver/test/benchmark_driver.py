@@ -0,0 +1,171 @@
+"""
+Benchmark DAKOTA driver overhead.
+
+Each driver is run on a trivially cheap component with many parameters and
+(for the optimizer) many constraints, so that nearly all of the run time is
+driver and DAKOTA overhead.  Results are printed and saved as JSON::
+
+    python benchmark_driver.py [--scale=small|full] [--output=bench.json]
+
+Per evaluation, ``driver_overhead`` is the callback time not spent running
+the workflow, and ``dakota`` is the time spent outside the callback.
+``input_generation`` is the mean time of one :meth:`configure_input`.
+"""
+
+import json
+import logging
+import optparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from numpy import arange, zeros
+
+from openmdao.main.api import Component, Assembly, set_as_top
+from openmdao.main.datatypes.api import Array, Float
+
+from dakota_driver import DakotaCONMIN, DakotaMultidimStudy, \
+                          DakotaVectorStudy, DakotaGlobalSAStudy
+
+# Problem sizes and (approximate) evaluations per study for each scale.
+SCALES = {
+    'small': dict(n_params=10, n_constraints=10, evaluations=1000,
+                  grid_params=2),
+    'full': dict(n_params=100, n_constraints=200, evaluations=100000,
+                 grid_params=3),
+}
+
+
+class Cheap(Component):
+    """ Sum of squares objective and bound constraints, sized on creation. """
+
+    def __init__(self, n_params, n_constraints):
+        super(Cheap, self).__init__()
+        self.add('x', Array(zeros(n_params), iotype='in'))
+        self.add('g', Array(zeros(n_constraints), iotype='out'))
+        self.add('f', Float(iotype='out'))
+        self._index = arange(n_constraints) % n_params
+
+    def execute(self):
+        """ Just evaluate the functions. """
+        self.f = (self.x**2).sum()
+        self.g = self.x[self._index] - 1.
+
+
+def build(driver, n_params, n_constraints=0):
+    """ Return top assembly running `driver` on a :class:`Cheap`. """
+    top = set_as_top(Assembly())
+    top.add('cheap', Cheap(n_params, n_constraints))
+    top.add('driver', driver)
+    driver.workflow.add('cheap')
+    driver.stdout = 'dakota.out'
+    driver.stderr = 'dakota.err'
+    driver.instrument = True
+    driver.add_parameter('cheap.x', low=-1., high=1.,
+                         start=[0.5] * n_params)
+    driver.add_objective('cheap.f')
+    return top
+
+
+def input_generation(driver, repeat=100):
+    """ Return mean seconds for one :meth:`configure_input`. """
+    start = time.time()
+    for i in range(repeat):
+        driver.configure_input()
+    return (time.time() - start) / repeat
+
+
+def run(name, top, n_constraints):
+    """ Run `top`, returning a result dictionary for driver `name`. """
+    driver = top.driver
+    top.run()
+    summary = driver.run_statistics.summary()
+    evals = max(summary['evaluations'], 1)
+    phases = summary['phases']
+    callback = phases.get('callback', dict(total=0.))['total']
+    workflow = phases.get('run_iteration', dict(total=0.))['total']
+    return dict(driver=name,
+                parameters=driver.total_parameters(),
+                constraints=n_constraints,
+                evaluations=summary['evaluations'],
+                elapsed=summary['elapsed'],
+                dakota=summary['dakota'] / evals,
+                callback=callback / evals,
+                workflow=workflow / evals,
+                driver_overhead=(callback - workflow) / evals,
+                input_generation=input_generation(driver))
+
+
+def benchmarks(scale):
+    """
+    Generate ``(name, top, n_constraints)`` for each benchmark at `scale`.
+    """
+    n_params = scale['n_params']
+    n_constraints = scale['n_constraints']
+    n_evals = scale['evaluations']
+
+    driver = DakotaCONMIN()
+    driver.max_iterations = n_evals
+    driver.max_function_evaluations = n_evals
+    top = build(driver, n_params, n_constraints)
+    driver.add_constraint('cheap.g <= 0')
+    yield 'DakotaCONMIN', top, n_constraints
+
+    grid_params = scale['grid_params']
+    driver = DakotaMultidimStudy()
+    driver.partitions = [int(round(n_evals ** (1. / grid_params))) - 1] \
+                        * grid_params
+    yield 'DakotaMultidimStudy', build(driver, grid_params), 0
+
+    driver = DakotaVectorStudy()
+    driver.final_point = [-0.5] * n_params
+    driver.num_steps = n_evals - 1
+    yield 'DakotaVectorStudy', build(driver, n_params), 0
+
+    driver = DakotaGlobalSAStudy()
+    driver.samples = n_evals
+    yield 'DakotaGlobalSAStudy', build(driver, n_params), 0
+
+
+def main(args=None):
+    """ Run benchmarks and save results. """
+    parser = optparse.OptionParser()
+    parser.add_option('--scale', default='small', choices=sorted(SCALES),
+                      help='Benchmark scale (%s)' % ', '.join(sorted(SCALES)))
+    parser.add_option('--output', default='bench_output.json',
+                      help='JSON results file')
+    options, args = parser.parse_args(args)
+    output = os.path.abspath(options.output)
+
+    results = []
+    orig_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp()
+    os.chdir(work_dir)
+    try:
+        for name, top, n_constraints in benchmarks(SCALES[options.scale]):
+            logging.info('Running %s', name)
+            result = run(name, top, n_constraints)
+            results.append(result)
+            print '%-20s %7d evals, overhead %.3g s/eval (driver %.3g,' \
+                  ' DAKOTA %.3g), input %.3g s' \
+                  % (name, result['evaluations'],
+                     result['driver_overhead'] + result['dakota'],
+                     result['driver_overhead'], result['dakota'],
+                     result['input_generation'])
+    finally:
+        os.chdir(orig_dir)
+        try:
+            shutil.rmtree(work_dir)
+        except OSError as exc:
+            # Currently no way to release DAKOTA streams.
+            logging.debug("Can't remove %s: %s", work_dir, exc)
+
+    with open(output, 'w') as out:
+        json.dump(dict(scale=options.scale, results=results), out, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
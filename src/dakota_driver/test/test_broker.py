@@ -0,0 +1,188 @@
+""" Test distributed evaluation via a socket broker. """
+
+import logging
+import multiprocessing
+import nose
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from multiprocessing.connection import Client
+
+from numpy import array
+
+from dakota_driver.broker import BrokerPool, parse_address, run_worker
+from dakota_driver.parallel import AsyncScheduler
+
+
+class Quadratic(object):
+    """ Picklable evaluator returning ``sum(x**2)`` and the worker pid. """
+
+    def __call__(self, point, asv):
+        return array([sum(x**2 for x in point), os.getpid()])
+
+
+class DiesOnce(object):
+    """ Picklable evaluator whose first call kills its worker process. """
+
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __call__(self, point, asv):
+        if not os.path.exists(self.marker):
+            open(self.marker, 'w').close()
+            os._exit(1)
+        return array([2. * point[0]])
+
+
+class AlwaysDies(object):
+    """ Picklable evaluator which always kills its worker process. """
+
+    def __call__(self, point, asv):
+        os._exit(1)
+
+
+class Failing(object):
+    """ Picklable evaluator which always raises an exception. """
+
+    def __call__(self, point, asv):
+        raise RuntimeError('Evaluating %s' % list(point))
+
+
+class MakesFile(object):
+    """ Creates `path` when unpickled. """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return (os.mkdir, (self.path,))
+
+
+class TestCase(unittest.TestCase):
+    """ Test distributed evaluation via a socket broker. """
+
+    def setUp(self):
+        self.marker = tempfile.mktemp()
+
+    def tearDown(self):
+        if os.path.isdir(self.marker):
+            os.rmdir(self.marker)
+        elif os.path.exists(self.marker):
+            os.remove(self.marker)
+
+    def test_evaluate(self):
+        logging.debug('')
+        logging.debug('test_evaluate')
+
+        points = [[float(i), 1.] for i in range(20)]
+        pool = BrokerPool(Quadratic(), 2)
+        try:
+            fns = pool.evaluate(points, [1])
+        finally:
+            pool.close()
+
+        self.assertEqual(fns.shape, (20, 2))
+        self.assertEqual(list(fns[:, 0]), [i*i + 1. for i in range(20)])
+        self.assertFalse(os.getpid() in fns[:, 1])
+
+    def test_remote(self):
+        logging.debug('')
+        logging.debug('test_remote')
+
+        # No local workers, one 'remote' worker with an explicit key.
+        pool = BrokerPool(Quadratic(), 0, authkey='secret', remote_workers=1)
+        self.assertEqual(pool.n_workers, 1)
+        host, port = pool.address
+        worker = multiprocessing.Process(
+                     target=run_worker,
+                     args=(parse_address('%s:%s' % (host, port)), 'secret'))
+        worker.start()
+        try:
+            fns = pool.evaluate([[1., 2.], [3., 4.]], [1])
+        finally:
+            pool.close()
+            worker.join()
+
+        self.assertEqual(list(fns[:, 0]), [5., 25.])
+        self.assertEqual(fns[0, 1], worker.pid)
+
+    def test_resubmit(self):
+        logging.debug('')
+        logging.debug('test_resubmit')
+
+        pool = BrokerPool(DiesOnce(self.marker), 2)
+        try:
+            fns = pool.evaluate([[float(i)] for i in range(6)], [1])
+        finally:
+            pool.close()
+        self.assertEqual(list(fns[:, 0]), [2. * i for i in range(6)])
+
+        pool = BrokerPool(AlwaysDies(), 1, max_resubmits=1)
+        try:
+            pool.evaluate([[1.]], [1])
+        except RuntimeError as exc:
+            self.assertTrue('Lost 2 workers evaluating [1.0]' in str(exc))
+        else:
+            self.fail('Expected RuntimeError')
+        finally:
+            pool.terminate()
+
+    def test_scheduler(self):
+        logging.debug('')
+        logging.debug('test_scheduler')
+
+        scheduler = AsyncScheduler(BrokerPool(Quadratic(), 2))
+        try:
+            tickets = dict((scheduler.submit([float(i)], [1]), i)
+                           for i in range(5))
+            results = dict((tickets[ticket], vals[0])
+                           for ticket, vals in scheduler.as_completed())
+        finally:
+            scheduler.close()
+        self.assertEqual(results, dict((i, i*i) for i in range(5)))
+
+        scheduler = AsyncScheduler(BrokerPool(Failing(), 1))
+        try:
+            scheduler.submit([1.], [1])
+            self.assertRaises(RuntimeError, scheduler.next_completed)
+        finally:
+            scheduler.terminate()
+
+    def test_authkey(self):
+        logging.debug('')
+        logging.debug('test_authkey')
+
+        # A client without the key gets nothing and sends nothing.
+        pool = BrokerPool(Quadratic(), 0, remote_workers=1)
+        try:
+            conn = Client(pool.address)
+            conn.send(MakesFile(self.marker))
+            try:
+                reply = conn.recv()
+            except Exception:
+                reply = None
+            conn.close()
+            time.sleep(0.5)
+        finally:
+            pool.terminate()
+        self.assertFalse(isinstance(reply, tuple))
+        self.assertFalse(os.path.exists(self.marker))
+
+        self.assertRaises(ValueError, BrokerPool, Quadratic(), 0,
+                          ('0.0.0.0', 0))
+
+    def test_address(self):
+        logging.debug('')
+        logging.debug('test_address')
+
+        self.assertEqual(parse_address('node1:5000'), ('node1', 5000))
+        self.assertRaises(ValueError, parse_address, '5000')
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=dakota_driver')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()
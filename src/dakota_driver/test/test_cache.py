@@ -0,0 +1,56 @@
+""" Test evaluation cache. """
+
+import logging
+import nose
+import sys
+import unittest
+
+from numpy import array
+
+from dakota_driver.cache import EvaluationCache
+
+
+class TestCase(unittest.TestCase):
+    """ Test evaluation cache. """
+
+    def test_lru(self):
+        logging.debug('')
+        logging.debug('test_lru')
+
+        cache = EvaluationCache(2)
+        cache.put(array([1., 2.]), [1], 'a')
+        cache.put(array([3., 4.]), [1], 'b')
+        self.assertEqual(cache.get(array([1., 2.]), [1]), 'a')
+        self.assertEqual(cache.get(array([1., 2.]), [3]), None)
+
+        # [3, 4] is now least recently used.
+        cache.put(array([5., 6.]), [1], 'c')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(array([3., 4.]), [1]), None)
+        self.assertEqual(cache.get(array([1., 2.]), [1]), 'a')
+        self.assertEqual(cache.get(array([5., 6.]), [1]), 'c')
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(cache.misses, 2)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
+
+    def test_rounding(self):
+        logging.debug('')
+        logging.debug('test_rounding')
+
+        cache = EvaluationCache(10)
+        cache.put(array([0.1 + 0.2]), [1], 'a')
+        self.assertEqual(cache.get(array([0.3]), [1]), None)
+
+        cache = EvaluationCache(10, decimals=8)
+        cache.put(array([0.1 + 0.2]), [1], 'a')
+        self.assertEqual(cache.get(array([0.3]), [1]), 'a')
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=dakota_driver')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()
@@ -0,0 +1,67 @@
+""" Test persistent evaluation database. """
+
+import logging
+import nose
+import os.path
+import shutil
+import sys
+import tempfile
+import unittest
+
+from numpy import array
+
+from dakota_driver.database import EvaluationDatabase
+
+
+class TestCase(unittest.TestCase):
+    """ Test persistent evaluation database. """
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'evaluations.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_reuse(self):
+        logging.debug('')
+        logging.debug('test_reuse')
+
+        database = EvaluationDatabase(self.filename, 'problem')
+        database.put(array([1., 2.]), [1], dict(fns=array([3.])))
+        database.put(array([1., 2.]), [3], dict(fns=array([3.]),
+                                                fnGrads=array([[1., 1.]])))
+        self.assertEqual(len(database), 2)
+        database.close()
+
+        # New session, same problem.
+        database = EvaluationDatabase(self.filename, 'problem')
+        retval = database.get([1., 2.], [1])
+        self.assertEqual(list(retval['fns']), [3.])
+        self.assertFalse('fnGrads' in retval)
+        retval = database.get([1., 2.], [3])
+        self.assertEqual(list(retval['fnGrads'][0]), [1., 1.])
+        self.assertEqual(database.get([1., 2.1], [1]), None)
+        self.assertEqual(database.hits, 2)
+        database.close()
+
+        # Different problem in same file.
+        database = EvaluationDatabase(self.filename, 'other')
+        self.assertEqual(len(database), 0)
+        self.assertEqual(database.get([1., 2.], [1]), None)
+        database.close()
+
+    def test_rounding(self):
+        logging.debug('')
+        logging.debug('test_rounding')
+
+        database = EvaluationDatabase(self.filename, 'problem', decimals=8)
+        database.put(array([0.1 + 0.2]), [1], dict(fns=array([1.])))
+        self.assertEqual(list(database.get([0.3], [1])['fns']), [1.])
+        database.close()
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=dakota_driver')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()
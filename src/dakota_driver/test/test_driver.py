@@ -5,15 +5,21 @@ import glob
 import logging
 import nose
 import os.path
+import subprocess
 import sys
 import unittest
 
+from numpy import array
+
 from openmdao.main.api import Component, Assembly, set_as_top
-from openmdao.main.datatypes.api import Array, Float
+from openmdao.main.datatypes.api import Array, Bool, Enum, Float, Int
 from openmdao.util.testutil import assert_rel_error, assert_raises
 
-from dakota_driver import DakotaCONMIN, DakotaMultidimStudy, \
-                          DakotaVectorStudy, DakotaGlobalSAStudy
+from dakota_driver import DakotaCONMIN, DakotaNewton, \
+                          DakotaSurrogateOptimizer, DakotaMultidimStudy, \
+                          DakotaMultilevelSampling, DakotaVectorStudy, \
+                          DakotaGlobalSAStudy, execute_concurrently
+from dakota_driver.tabular import load_tabular
 
 
 class Rosenbrock(Component):
@@ -29,6 +35,23 @@ class Rosenbrock(Component):
         self.f = 100 * (x2 - x1**2)**2 + (1 - x1)**2
 
 
+class RoughRosenbrock(Rosenbrock):
+    """ Low-fidelity approximation to :class:`Rosenbrock`. """
+
+    def execute(self):
+        """ Evaluate a perturbed function. """
+        super(RoughRosenbrock, self).execute()
+        self.f = 1.1 * self.f + 0.1
+
+
+def low_fidelity():
+    """ Return low-fidelity model of :class:`Optimization`. """
+    top = set_as_top(Assembly())
+    top.add('rosenbrock', RoughRosenbrock())
+    top.driver.workflow.add('rosenbrock')
+    return top
+
+
 class Textbook(Component):
     """ DAKOTA 'text_book' function. """
 
@@ -53,6 +76,73 @@ class Broken(Component):
         raise RuntimeError('Evaluating x1=%s, x2=%s' % (self.x1, self.x2))
 
 
+class Flaky(Rosenbrock):
+    """ Rosenbrock which fails for ``x[0] > 1.5``. """
+
+    def execute(self):
+        """ Raise a RuntimeError or evaluate the function. """
+        if self.x[0] > 1.5:
+            raise RuntimeError('x[0] %s too big' % self.x[0])
+        super(Flaky, self).execute()
+
+
+class Offset(Rosenbrock):
+    """ Rosenbrock plus `offset`. """
+
+    offset = Float(0., iotype='in')
+
+    def execute(self):
+        """ Evaluate the function and add `offset`. """
+        super(Offset, self).execute()
+        self.f += self.offset
+
+
+class ProcessInfo(Rosenbrock):
+    """ Rosenbrock recording its process and if DAKOTA is loaded there. """
+
+    pid = Int(iotype='out')
+    dakota_loaded = Bool(iotype='out')
+
+    def execute(self):
+        """ Evaluate the function and record process information. """
+        super(ProcessInfo, self).execute()
+        self.pid = os.getpid()
+        self.dakota_loaded = 'dakota' in sys.modules
+
+
+class Unreliable(Rosenbrock):
+    """ Rosenbrock which fails every other execution. """
+
+    def __init__(self):
+        super(Unreliable, self).__init__()
+        self.count = 0
+
+    def execute(self):
+        """ Raise a RuntimeError or evaluate the function. """
+        self.count += 1
+        if self.count % 2:
+            raise RuntimeError('Execution %s failed' % self.count)
+        super(Unreliable, self).execute()
+
+
+class Mixed(Component):
+    """ Function of continuous, integer and enumerated inputs. """
+
+    x = Float(iotype='in')
+    n = Int(0, low=0, high=4, iotype='in')
+    k = Enum(1, values=(1, 3, 5), iotype='in')
+    f = Float(iotype='out')
+
+    def __init__(self):
+        super(Mixed, self).__init__()
+        self.count = 0
+
+    def execute(self):
+        """ Just evaluate the function. """
+        self.count += 1
+        self.f = self.x**2 + self.n + self.k
+
+
 class Optimization(Assembly):
     """ Use DAKOTA to perform an optimization. """
 
@@ -161,7 +251,8 @@ class TestCase(unittest.TestCase):
     def tearDown(self):
         """ Cleanup files. """
         for pattern in ('LHS*', 'S4', 'dakota.out', 'dakota.err',
-                        'dakota.rst', 'dakota_tabular.dat', 'driver.in'):
+                        'dakota.rst', 'dakota_tabular.dat', 'driver.in',
+                        'evaluations.db', 'evaluations.tab'):
             for name in glob.glob(pattern):
                 try:
                     os.remove(name)
@@ -195,6 +286,53 @@ class TestCase(unittest.TestCase):
         assert_rel_error(self, float(row[2]), 0.98869321, 0.00001)
         assert_rel_error(self, float(row[3]), 7.59464541e-05, 0.00001)
 
+    def test_restore_best(self):
+        # Test best point outputs and restoring the workflow to them.
+        logging.debug('')
+        logging.debug('test_restore_best')
+
+        top = Optimization()
+        top.driver.restore_best = True
+        top.run()
+        self.assertEqual(len(top.driver.best_point), 2)
+        self.assertEqual(top.driver.best_point[0], top.rosenbrock.x[0])
+        self.assertEqual(top.driver.best_point[1], top.rosenbrock.x[1])
+        self.assertEqual(top.driver.best_objective, top.rosenbrock.f)
+        self.assertTrue(top.rosenbrock.f <= 7.59464541e-05 * (1 + 1e-5))
+
+        # Restored from recorded values, without another execution.
+        other = Optimization()
+        other.run()
+        self.assertEqual(top.rosenbrock.exec_count,
+                         other.rosenbrock.exec_count)
+
+    def test_cache(self):
+        # Test evaluation cache.
+        logging.debug('')
+        logging.debug('test_cache')
+
+        top = Optimization()
+        top.driver.cache_size = 1000
+        top.driver.cache_decimals = 12
+        top.run()
+        assert_rel_error(self, top.rosenbrock.x[0], 0.99401209, 0.00001)
+        assert_rel_error(self, top.rosenbrock.x[1], 0.98869321, 0.00001)
+        assert_rel_error(self, top.rosenbrock.f,  7.59464541e-05, 0.00001)
+        self.assertTrue(top.driver.cache_misses > 0)
+        self.assertTrue(top.driver.cache_hits + top.driver.cache_misses >= 82)
+
+        # Rounding to whole numbers maps the 9 x 9 grid onto 5 x 5 points.
+        top = ParameterStudy()
+        top.driver.cache_size = 1000
+        top.driver.cache_decimals = 0
+        top.run()
+        self.assertEqual(top.driver.cache_misses, 25)
+        self.assertEqual(top.driver.cache_hits, 81 - 25)
+        # Last point was a hit, so the workflow is run once more to leave
+        # it at that point.
+        self.assertEqual(top.rosenbrock.exec_count,
+                         81 - top.driver.cache_hits + 1)
+
     def test_constrained_optimization(self):
         # Test DakotaCONMIN driver.
         logging.debug('')
@@ -229,6 +367,131 @@ class TestCase(unittest.TestCase):
         assert_raises(self, 'top.run()', globals(), locals(), ValueError,
                       'driver: No parameters, run aborted')
 
+    def test_concurrent_gradients(self):
+        # Test DakotaCONMIN with finite differences evaluated concurrently.
+        logging.debug('')
+        logging.debug('test_concurrent_gradients')
+
+        top = set_as_top(ConstrainedOptimization())
+        top.driver.n_workers = 2
+        top.driver.evaluation_concurrency = 4
+        top.run()
+        self.assertTrue('analytic_gradients' in top.driver.input.responses)
+        assert_rel_error(self, top.textbook.x1, 0.5, 0.001)
+        assert_rel_error(self, top.textbook.x2, 0.43167254, 0.001)
+        assert_rel_error(self, top.textbook.f,  0.16682649, 0.001)
+
+    def test_analytic_gradients(self):
+        # Test DakotaCONMIN driver using the workflow's derivatives.
+        logging.debug('')
+        logging.debug('test_analytic_gradients')
+
+        top = set_as_top(ConstrainedOptimization())
+        top.driver.gradients = 'analytic'
+        top.run()
+        self.assertTrue('analytic_gradients' in top.driver.input.responses)
+        assert_rel_error(self, top.textbook.x1, 0.5, 0.001)
+        assert_rel_error(self, top.textbook.x2, 0.43167254, 0.001)
+        assert_rel_error(self, top.textbook.f,  0.16682649, 0.001)
+
+    def test_newton(self):
+        # Test DakotaNewton driver with quasi-Newton and analytic Hessians.
+        logging.debug('')
+        logging.debug('test_newton')
+
+        for gradients, hessians in (('numerical', 'bfgs'),
+                                    ('analytic', 'analytic')):
+            top = set_as_top(Assembly())
+            top.add('rosenbrock', Rosenbrock())
+            driver = top.add('driver', DakotaNewton())
+            driver.workflow.add('rosenbrock')
+            driver.stdout = 'dakota.out'
+            driver.stderr = 'dakota.err'
+            driver.gradients = gradients
+            driver.hessians = hessians
+            driver.convergence_tolerance = 1e-8
+            driver.add_parameter('rosenbrock.x', low=-2, high=2,
+                                 start=(-1.2, 1))
+            driver.add_objective('rosenbrock.f')
+            top.run()
+
+            assert_rel_error(self, top.rosenbrock.x[0], 1., 0.001)
+            assert_rel_error(self, top.rosenbrock.x[1], 1., 0.001)
+
+        driver.hessians = 'none'
+        assert_raises(self, 'top.run()', globals(), locals(), ValueError,
+                      'driver: optpp_newton requires hessians')
+
+    def test_surrogate(self):
+        # Test DakotaSurrogateOptimizer driver within a budget.
+        logging.debug('')
+        logging.debug('test_surrogate')
+
+        for method in ('efficient_global', 'surrogate_based_local'):
+            top = set_as_top(Assembly())
+            top.add('rosenbrock', Rosenbrock())
+            driver = top.add('driver', DakotaSurrogateOptimizer())
+            driver.workflow.add('rosenbrock')
+            driver.stdout = 'dakota.out'
+            driver.stderr = 'dakota.err'
+            driver.instrument = True
+            driver.method = method
+            driver.surrogate = 'quadratic'
+            driver.max_function_evaluations = 50
+            driver.add_parameter('rosenbrock.x', low=-2, high=2,
+                                 start=(-1.2, 1))
+            driver.add_objective('rosenbrock.f')
+            top.run()
+
+            self.assertTrue(driver.run_statistics.evaluations <=
+                            driver.max_function_evaluations)
+            self.assertTrue(driver.best_objective < 0.1)
+            assert_rel_error(self, driver.best_point[0], 1., 0.3)
+            assert_rel_error(self, driver.best_point[1], 1., 0.3)
+
+    def test_multifidelity(self):
+        # Test use of a low-fidelity model.
+        logging.debug('')
+        logging.debug('test_multifidelity')
+
+        top = set_as_top(SensitivityStudy())
+        top.replace('driver', DakotaMultilevelSampling())
+        top.driver.workflow.add('rosenbrock')
+        top.driver.stdout = 'dakota.out'
+        top.driver.stderr = 'dakota.err'
+        top.driver.instrument = True
+        top.driver.add_parameter('rosenbrock.x', low=-2, high=2)
+        top.driver.add_objective('rosenbrock.f')
+        top.driver.set_low_fidelity(low_fidelity())
+        top.run()
+        self.assertTrue(top.driver.low_fidelity_evaluations >
+                        top.driver.run_statistics.evaluations)
+
+        top = set_as_top(Assembly())
+        top.add('rosenbrock', Rosenbrock())
+        driver = top.add('driver', DakotaSurrogateOptimizer())
+        driver.workflow.add('rosenbrock')
+        driver.stdout = 'dakota.out'
+        driver.stderr = 'dakota.err'
+        driver.instrument = True
+        driver.method = 'surrogate_based_local'
+        driver.max_function_evaluations = 50
+        driver.add_parameter('rosenbrock.x', low=-2, high=2, start=(-1.2, 1))
+        driver.add_objective('rosenbrock.f')
+        driver.set_low_fidelity(low_fidelity())
+        top.run()
+        self.assertTrue(driver.low_fidelity_evaluations > 0)
+        self.assertTrue(driver.run_statistics.evaluations <=
+                        driver.max_function_evaluations)
+        self.assertTrue(driver.best_objective < 0.1)
+        assert_rel_error(self, driver.best_point[0], 1., 0.3)
+        assert_rel_error(self, driver.best_point[1], 1., 0.3)
+
+        top = Optimization()
+        top.driver.set_low_fidelity(low_fidelity())
+        assert_raises(self, 'top.run()', globals(), locals(), ValueError,
+                      'driver: Low fidelity model not supported')
+
     def test_broken_optimization(self):
         # Test exception handling. This requires a modified version of
         # DAKOTA that can be configured to not exit on analysis failure.
@@ -245,6 +508,45 @@ class TestCase(unittest.TestCase):
         else:
             self.fail('Expected RuntimeError')
 
+    def test_failures(self):
+        # Test failed evaluations don't abort the study.
+        logging.debug('')
+        logging.debug('test_failures')
+
+        top = set_as_top(SensitivityStudy())
+        top.replace('rosenbrock', Flaky())
+        top.driver.failure_action = 'nan'
+        top.run()
+
+        with open('dakota_tabular.dat', 'rb') as inp:
+            reader = csv.reader(inp, delimiter=' ', skipinitialspace=True)
+            rows = list(reader)
+        self.assertEqual(len(rows), 101)
+
+        failures = top.driver.failures
+        self.assertTrue(failures)
+        self.assertEqual(len(failures),
+                         len([row for row in rows[1:] if float(row[1]) > 1.5]))
+        for point, message, trace in failures:
+            self.assertTrue(point[0] > 1.5)
+            self.assertTrue('too big' in message)
+            self.assertTrue('RuntimeError' in trace)
+        self.assertTrue(top.driver.failure_summary().startswith(
+                        '%d evaluations failed' % len(failures)))
+        self.assertTrue(top.driver.means[0] == top.driver.means[0])  # !NaN
+
+    def test_retries(self):
+        # Test failed evaluations are retried.
+        logging.debug('')
+        logging.debug('test_retries')
+
+        top = ParameterStudy()
+        top.replace('rosenbrock', Unreliable())
+        top.driver.max_retries = 1
+        top.run()
+        self.assertEqual(top.rosenbrock.f,  401)
+        self.assertEqual(top.driver.failures, [])
+
     def test_multidim(self):
         # Test DakotaMultidimStudy driver.
         logging.debug('')
@@ -260,6 +562,145 @@ class TestCase(unittest.TestCase):
         assert_raises(self, 'top.run()', globals(), locals(), ValueError,
                       'driver: #partitions (3) != #parameters (2)')
 
+    def test_input_file(self):
+        # Test input is written to a private file unless requested.
+        logging.debug('')
+        logging.debug('test_input_file')
+
+        top = ParameterStudy()
+        top.run()
+        self.assertFalse(os.path.exists('driver.in'))
+        self.assertEqual(top.rosenbrock.f, 401)
+
+        top.driver.input_file = 'driver.in'
+        top.run()
+        self.assertTrue(os.path.exists('driver.in'))
+        self.assertEqual(top.rosenbrock.f, 401)
+
+    def test_discrete(self):
+        # Test study of integer and enumerated parameters.
+        logging.debug('')
+        logging.debug('test_discrete')
+
+        top = set_as_top(Assembly())
+        top.add('mixed', Mixed())
+        driver = top.add('driver', DakotaMultidimStudy())
+        driver.workflow.add('mixed')
+        driver.stdout = 'dakota.out'
+        driver.stderr = 'dakota.err'
+        driver.tabular_graphics_data = True
+        driver.add_parameter('mixed.k')
+        driver.add_parameter('mixed.x', low=-1, high=1)
+        driver.add_parameter('mixed.n')
+        driver.add_objective('mixed.f')
+        driver.partitions = [2, 2, 4]
+        top.run()
+
+        # One evaluation per discrete point.
+        self.assertEqual(top.mixed.count, 3 * 3 * 5)
+        self.assertEqual(top.mixed.k, 5)
+        self.assertEqual(top.mixed.x, 1)
+        self.assertEqual(top.mixed.n, 4)
+        self.assertEqual(top.mixed.f, 10)
+
+        with open('dakota_tabular.dat', 'rb') as inp:
+            reader = csv.reader(inp, delimiter=' ', skipinitialspace=True)
+            rows = list(reader)
+        self.assertEqual(len(rows), 3 * 3 * 5 + 1)
+
+        # Continuous before integer, already in DAKOTA's order.
+        top.mixed.count = 0
+        top.mixed.k = 3
+        driver.clear_parameters()
+        driver.add_parameter('mixed.x', low=-1, high=1)
+        driver.add_parameter('mixed.n')
+        driver.partitions = [2, 4]
+        top.run()
+        self.assertEqual(top.mixed.count, 3 * 5)
+        self.assertEqual(top.mixed.x, 1)
+        self.assertEqual(top.mixed.n, 4)
+        self.assertEqual(top.mixed.f, 8)
+
+        # Only integers.
+        top.mixed.count = 0
+        top.mixed.x = 0.
+        driver.clear_parameters()
+        driver.add_parameter('mixed.n')
+        driver.partitions = [4]
+        top.run()
+        self.assertEqual(top.mixed.count, 5)
+        self.assertEqual(top.mixed.n, 4)
+        self.assertEqual(top.mixed.f, 7)
+
+    def test_reconfigure(self):
+        # Test input is only regenerated and rewritten when changed.
+        logging.debug('')
+        logging.debug('test_reconfigure')
+
+        top = ParameterStudy()
+        top.driver.input_file = 'driver.in'
+        calls = []
+        configure_input = top.driver.configure_input
+        def counting_configure():
+            calls.append(1)
+            configure_input()
+        top.driver.configure_input = counting_configure
+
+        top.run()
+        self.assertEqual(len(calls), 1)
+        os.utime('driver.in', (0, 0))
+
+        top.run()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(os.path.getmtime('driver.in'), 0)
+        self.assertEqual(top.rosenbrock.f, 401)
+
+        top.driver.partitions = [4, 4]
+        top.run()
+        self.assertEqual(len(calls), 2)
+        self.assertNotEqual(os.path.getmtime('driver.in'), 0)
+        self.assertEqual(top.rosenbrock.f, 401)
+
+    def test_import(self):
+        # Test the DAKOTA binding isn't loaded by importing or creating drivers.
+        logging.debug('')
+        logging.debug('test_import')
+
+        # OpenMDAO is needed anyway, so is the baseline.
+        code = '; '.join(['import sys, time',
+                          'start = time.time()',
+                          'import openmdao.main.api',
+                          'import openmdao.main.datatypes.api',
+                          'baseline = time.time() - start',
+                          'start = time.time()',
+                          'import dakota_driver',
+                          'elapsed = time.time() - start',
+                          'dakota_driver.DakotaCONMIN()',
+                          "print baseline, elapsed, 'dakota' in sys.modules"])
+        output = subprocess.check_output([sys.executable, '-c', code])
+        baseline, elapsed, loaded = output.split()
+        logging.debug('import time %s, OpenMDAO %s', elapsed, baseline)
+        self.assertEqual(loaded, 'False')
+        self.assertTrue(float(elapsed) < max(float(baseline), 0.5))
+
+    def test_instrument(self):
+        # Test run instrumentation.
+        logging.debug('')
+        logging.debug('test_instrument')
+
+        top = ParameterStudy()
+        top.run()
+        self.assertEqual(top.driver.run_statistics, None)
+
+        top.driver.instrument = True
+        top.run()
+        summary = top.driver.run_statistics.summary()
+        self.assertEqual(summary['evaluations'], 81)
+        for phase in ('callback', 'set_parameters', 'run_iteration',
+                      'responses'):
+            self.assertEqual(summary['phases'][phase]['count'], 81)
+        self.assertTrue(summary['elapsed'] >= summary['dakota'])
+
     def test_vector(self):
         # Test DakotaVectorStudy driver.
         logging.debug('')
@@ -294,6 +735,349 @@ class TestCase(unittest.TestCase):
                 count += 1
         self.assertEqual(count, 101)
 
+        self.assertEqual(top.driver.means.shape, (1,))
+        self.assertEqual(top.driver.std_deviations.shape, (1,))
+        self.assertEqual(top.driver.correlations.shape, (2, 1))
+        self.assertTrue(top.driver.std_deviations[0] > 0.)
+
+        # No statistics from the previous run if every sample fails.
+        top.replace('rosenbrock', Flaky())
+        top.driver.failure_action = 'nan'
+        top.driver.clear_parameters()
+        top.driver.add_parameter('rosenbrock.x', low=1.6, high=2)
+        top.run()
+        self.assertEqual(len(top.driver.failures), 100)
+        self.assertEqual(top.driver.means.shape, (0,))
+        self.assertEqual(top.driver.std_deviations.shape, (0,))
+        self.assertEqual(top.driver.correlations.shape, (0,))
+
+    def test_numpy_engine(self):
+        # Test studies generating their points without DAKOTA.
+        logging.debug('')
+        logging.debug('test_numpy_engine')
+
+        top = ParameterStudy()
+        top.driver.engine = 'numpy'
+        top.driver.tabular_graphics_data = True
+        top.run()
+        self.assertEqual(top.rosenbrock.x[0], 2)
+        self.assertEqual(top.rosenbrock.x[1], 2)
+        self.assertEqual(top.rosenbrock.f,  401)
+        with open('dakota_tabular.dat', 'rb') as inp:
+            reader = csv.reader(inp, delimiter=' ', skipinitialspace=True)
+            rows = list(reader)
+        self.assertEqual(len(rows), 82)
+        self.assertEqual(rows[0], ['%eval_id', 'rosenbrock.x[0]',
+                                   'rosenbrock.x[1]', 'rosenbrock.f'])
+        self.assertEqual([float(val) for val in rows[1]], [1, -2, -2, 3609])
+
+        # Both engines follow the same path.
+        tables = []
+        for engine in ('dakota', 'numpy'):
+            top = VectorStudy()
+            top.driver.engine = engine
+            top.driver.tabular_graphics_data = True
+            top.run()
+            assert_rel_error(self, top.rosenbrock.x[0], 1.1, 0.00001)
+            assert_rel_error(self, top.rosenbrock.x[1], 1.3, 0.00001)
+            assert_rel_error(self, top.rosenbrock.f,  0.82, 0.00001)
+            with open('dakota_tabular.dat', 'rb') as inp:
+                reader = csv.reader(inp, delimiter=' ', skipinitialspace=True)
+                rows = list(reader)[1:]
+            tables.append([[float(val) for val in row if val]
+                           for row in rows])
+        self.assertEqual(len(tables[0]), 11)
+        self.assertEqual(len(tables[1]), 11)
+        assert_rel_error(self, tables[0][0][1], -0.3, 0.00001)
+        assert_rel_error(self, tables[0][0][2], 0.2, 0.00001)
+        for dakota_row, numpy_row in zip(*tables):
+            self.assertEqual(len(dakota_row), len(numpy_row))
+            for expected, actual in zip(dakota_row, numpy_row):
+                self.assertTrue(abs(actual - expected)
+                                <= 1e-6 * max(abs(expected), 1.))
+
+        top = set_as_top(SensitivityStudy())
+        top.driver.engine = 'numpy'
+        top.run()
+        with open('dakota_tabular.dat', 'rb') as inp:
+            self.assertEqual(len(inp.readlines()), 101)
+        self.assertEqual(top.driver.means.shape, (1,))
+        self.assertEqual(top.driver.correlations.shape, (2, 1))
+        self.assertTrue(top.driver.std_deviations[0] > 0.)
+
+        top.driver.samples = 1000
+        top.driver.n_workers = 2
+        top.run()
+        with open('dakota_tabular.dat', 'rb') as inp:
+            self.assertEqual(len(inp.readlines()), 1001)
+
+        # Workflow is left at the last point after parallel evaluation.
+        top = ParameterStudy()
+        top.driver.engine = 'numpy'
+        top.driver.n_workers = 2
+        top.driver.evaluation_database = 'evaluations.db'
+        top.run()
+        self.assertEqual(top.rosenbrock.x[0], 2)
+        self.assertEqual(top.rosenbrock.x[1], 2)
+        self.assertEqual(top.rosenbrock.f,  401)
+        self.assertEqual(top.driver.database_hits, 0)
+
+        # Evaluations are reused from the database, and the cache is used.
+        top = ParameterStudy()
+        top.driver.engine = 'numpy'
+        top.driver.evaluation_database = 'evaluations.db'
+        top.run()
+        self.assertEqual(top.driver.database_hits, 81)
+        self.assertEqual(top.rosenbrock.f,  401)
+        top.driver.evaluation_database = ''
+        top.driver.cache_size = 100
+        top.run()
+        self.assertEqual(top.driver.cache_misses, 81)
+
+    def test_sobol(self):
+        # Test Sobol indices from pick-freeze sampling.
+        logging.debug('')
+        logging.debug('test_sobol')
+
+        top = set_as_top(SensitivityStudy())
+        top.driver.sobol = True
+        assert_raises(self, 'top.run()', globals(), locals(), ValueError,
+                      'driver: Sobol indices require the numpy engine')
+
+        top.driver.engine = 'numpy'
+        top.driver.samples = 500
+        top.run()
+        with open('dakota_tabular.dat', 'rb') as inp:
+            self.assertEqual(len(inp.readlines()), 500 * 4 + 1)
+        self.assertEqual(top.driver.means.shape, (1,))
+        self.assertEqual(top.driver.correlations.shape, (2, 1))
+        self.assertEqual(top.driver.sobol_first.shape, (2, 1))
+        self.assertEqual(top.driver.sobol_total.shape, (2, 1))
+        for i in range(2):
+            self.assertTrue(top.driver.sobol_total[i, 0] > 0.)
+            self.assertTrue(top.driver.sobol_total[i, 0] + 0.1 >=
+                            top.driver.sobol_first[i, 0])
+
+    def test_batch(self):
+        # Test batch evaluation.
+        logging.debug('')
+        logging.debug('test_batch')
+
+        top = set_as_top(ParameterStudy())
+        points = [[-2., -2.], [0., 0.], [1., 1.], [2., 2.]]
+        fns = top.driver.evaluate_batch(points)
+        self.assertEqual(fns.shape, (4, 1))
+        self.assertEqual(list(fns[:, 0]), [3609., 1., 0., 401.])
+
+        retval = top.driver.dakota_callback(cv=array(points),
+                                            asv=array([[1]] * 4))
+        self.assertEqual(list(retval['fns'][:, 0]), [3609., 1., 0., 401.])
+
+        # Values not requested are zero.
+        fns = top.driver.evaluate_batch(points, [0])
+        self.assertEqual(list(fns[:, 0]), [0., 0., 0., 0.])
+
+    def test_parallel(self):
+        # Test parallel evaluation of a parameter study.
+        logging.debug('')
+        logging.debug('test_parallel')
+
+        top = ParameterStudy()
+        top.driver.n_workers = 2
+        top.driver.tabular_graphics_data = True
+        top.run()
+        self.assertEqual(top.rosenbrock.x[0], 2)
+        self.assertEqual(top.rosenbrock.x[1], 2)
+        self.assertEqual(top.rosenbrock.f,  401)
+
+        with open('dakota_tabular.dat', 'rb') as inp:
+            reader = csv.reader(inp, delimiter=' ', skipinitialspace=True)
+            rows = list(reader)
+        self.assertEqual(len(rows), 82)
+        self.assertEqual(float(rows[1][3]), 3609)
+
+    def test_broker(self):
+        # Test evaluation of a sensitivity study via the broker.
+        logging.debug('')
+        logging.debug('test_broker')
+
+        top = set_as_top(SensitivityStudy())
+        top.driver.n_workers = 2
+        top.driver.broker_address = 'localhost:0'
+        top.run()
+        assert_rel_error(self, top.rosenbrock.x[0],  1.091489532, 0.00001)
+        assert_rel_error(self, top.rosenbrock.x[1], -1.415779759, 0.00001)
+        assert_rel_error(self, top.rosenbrock.f,   679.7206145, 0.00001)
+
+    def test_isolated(self):
+        # Test running in a child process.
+        logging.debug('')
+        logging.debug('test_isolated')
+
+        top = set_as_top(SensitivityStudy())
+        top.driver.isolated = True
+        top.driver.tabular_file = 'evaluations.tab'
+        top.run()
+        assert_rel_error(self, top.rosenbrock.x[0],  1.091489532, 0.00001)
+        assert_rel_error(self, top.rosenbrock.x[1], -1.415779759, 0.00001)
+        assert_rel_error(self, top.rosenbrock.f,   679.7206145, 0.00001)
+        self.assertEqual(top.driver.means.shape, (1,))
+        self.assertTrue(top.driver.std_deviations[0] > 0.)
+        columns, data = load_tabular('evaluations.tab')
+        self.assertEqual(len(data), 100)
+
+        top.replace('rosenbrock', Flaky())
+        try:
+            top.run()
+        except RuntimeError as exc:
+            self.assertTrue(str(exc).startswith(
+                            'driver: Isolated DAKOTA run failed:'))
+            self.assertTrue('too big' in str(exc))
+        else:
+            self.fail('Expected RuntimeError')
+
+        # Independent studies at the same time.
+        tops = [set_as_top(SensitivityStudy()) for i in range(3)]
+        for i, top in enumerate(tops):
+            top.driver.seed = 52983 + i
+        drivers = [top.driver for top in tops]
+        drivers[0].tabular_graphics_data = True
+        if os.path.exists('dakota_tabular.dat'):
+            os.remove('dakota_tabular.dat')
+        execute_concurrently(drivers)
+        for top in tops:
+            self.assertEqual(top.driver.means.shape, (1,))
+            self.assertTrue(top.driver.std_deviations[0] > 0.)
+            self.assertEqual(top.driver.exec_count, 1)
+        self.assertNotEqual(tops[0].driver.means[0], tops[1].driver.means[0])
+        with open('dakota_tabular.dat', 'r') as inp:
+            self.assertEqual(len(inp.readlines()), 101)
+
+        drivers[1].tabular_graphics_data = True
+        assert_raises(self, 'execute_concurrently(drivers)',
+                      globals(), locals(), ValueError,
+                      'Concurrent drivers would overwrite dakota_tabular.dat')
+
+    def test_session(self):
+        # Test reuse of a persistent session process.
+        logging.debug('')
+        logging.debug('test_session')
+
+        top = set_as_top(SensitivityStudy())
+        top.replace('rosenbrock', Offset())
+        top.driver.persistent_session = True
+        try:
+            top.run()
+            pid = top.driver._session[0].pid
+            mean = top.driver.means[0]
+            assert_rel_error(self, top.rosenbrock.f, 679.7206145, 0.00001)
+            # Final values come from the session, not another execution.
+            self.assertEqual(top.rosenbrock.exec_count, 0)
+
+            # Changed component and driver inputs are sent to the session.
+            top.rosenbrock.offset = 1000.
+            top.run()
+            self.assertEqual(top.driver._session[0].pid, pid)
+            assert_rel_error(self, top.driver.means[0], mean + 1000., 0.00001)
+            top.driver.seed = 12345
+            top.run()
+            self.assertEqual(top.driver._session[0].pid, pid)
+            self.assertNotEqual(top.driver.means[0], mean + 1000.)
+
+            # Changed parameters need a new session.
+            top.driver.clear_parameters()
+            top.driver.add_parameter('rosenbrock.x', low=-1, high=1)
+            top.run()
+            self.assertNotEqual(top.driver._session[0].pid, pid)
+
+            # As does a replaced component.
+            pid = top.driver._session[0].pid
+            top.replace('rosenbrock', Offset())
+            top.run()
+            self.assertNotEqual(top.driver._session[0].pid, pid)
+        finally:
+            top.driver.close_session()
+        self.assertEqual(top.driver._session, None)
+
+    def test_session_reuse(self):
+        # Test session runs reuse one process with the DAKOTA binding loaded.
+        logging.debug('')
+        logging.debug('test_session_reuse')
+
+        # In a new process, so the DAKOTA binding isn't already loaded.
+        code = '\n'.join([
+            'import sys',
+            'from openmdao.main.api import set_as_top',
+            'from dakota_driver.test.test_driver import VectorStudy, \\',
+            '                                         ProcessInfo',
+            'def pids(top, n):',
+            '    result = []',
+            '    for i in range(n):',
+            '        top.run()',
+            '        assert top.rosenbrock.dakota_loaded',
+            '        result.append(top.rosenbrock.pid)',
+            '    return result',
+            'top = set_as_top(VectorStudy())',
+            "top.replace('rosenbrock', ProcessInfo())",
+            'top.driver.isolated = True',
+            'isolated = pids(top, 2)',
+            'top.driver.persistent_session = True',
+            'session = pids(top, 3)',
+            'top.driver.close_session()',
+            "print 'dakota' in sys.modules",
+            "print ' '.join(str(pid) for pid in isolated)",
+            "print ' '.join(str(pid) for pid in session)"])
+        output = subprocess.check_output([sys.executable, '-c', code])
+        loaded, isolated, session = output.strip().splitlines()[-3:]
+        isolated = isolated.split()
+        session = session.split()
+        logging.debug('isolated %s, session %s', isolated, session)
+
+        # Each isolated run loads the binding in a new process, the session
+        # loads it once.
+        self.assertEqual(loaded, 'False')
+        self.assertEqual(len(set(isolated)), 2)
+        self.assertEqual(len(set(session)), 1)
+        self.assertFalse(session[0] in isolated)
+
+    def test_database(self):
+        # Test reuse of evaluations from a database.
+        logging.debug('')
+        logging.debug('test_database')
+
+        top = set_as_top(SensitivityStudy())
+        top.driver.evaluation_database = 'evaluations.db'
+        top.run()
+        self.assertEqual(top.driver.database_hits, 0)
+
+        top = set_as_top(SensitivityStudy())
+        top.driver.evaluation_database = 'evaluations.db'
+        top.run()
+        self.assertEqual(top.driver.database_hits, 100)
+        assert_rel_error(self, top.rosenbrock.x[0],  1.091489532, 0.00001)
+        assert_rel_error(self, top.rosenbrock.x[1], -1.415779759, 0.00001)
+        assert_rel_error(self, top.rosenbrock.f,   679.7206145, 0.00001)
+
+    def test_tabular_file(self):
+        # Test streaming evaluations to a binary tabular file.
+        logging.debug('')
+        logging.debug('test_tabular_file')
+
+        top = set_as_top(SensitivityStudy())
+        top.driver.tabular_file = 'evaluations.tab'
+        top.run()
+
+        columns, data = load_tabular('evaluations.tab')
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(columns, ['eval_id', 'rosenbrock.x[0]',
+                                   'rosenbrock.x[1]', 'rosenbrock.f'])
+        self.assertEqual(data.shape, (100, 4))
+        self.assertEqual(data[-1, 0], 100)
+        assert_rel_error(self, data[-1, 1],  1.091489532, 0.00001)
+        assert_rel_error(self, data[-1, 2], -1.415779759, 0.00001)
+        assert_rel_error(self, data[-1, 3],   679.7206145, 0.00001)
+        del data
+
     def test_errors(self):
         # Test base error responses.
         logging.debug('')
@@ -0,0 +1,68 @@
+""" Test run instrumentation. """
+
+import logging
+import nose
+import sys
+import time
+import unittest
+
+from dakota_driver.instrument import RunStatistics
+
+
+class TestCase(unittest.TestCase):
+    """ Test run instrumentation. """
+
+    def test_summary(self):
+        logging.debug('')
+        logging.debug('test_summary')
+
+        stats = RunStatistics()
+        for i in range(100):
+            stats.record('callback', 0.01 * (i + 1))
+            stats.record('run_iteration', 0.001)
+            self.assertFalse(stats.evaluation_done(time.time()))
+        stats.cache_hits = 5
+        stats.stop()
+
+        summary = stats.summary()
+        self.assertEqual(summary['evaluations'], 100)
+        self.assertEqual(summary['cache_hits'], 5)
+        callback = summary['phases']['callback']
+        self.assertEqual(callback['count'], 100)
+        self.assertAlmostEqual(callback['total'], 50.5)
+        self.assertAlmostEqual(callback['mean'], 0.505)
+        self.assertAlmostEqual(callback['min'], 0.01)
+        self.assertAlmostEqual(callback['max'], 1.)
+        self.assertTrue(abs(callback['p95'] - 0.95) < 0.95 * 0.015)
+        self.assertAlmostEqual(summary['phases']['run_iteration']['p95'],
+                               0.001)
+        self.assertEqual(summary['dakota'], 0.)
+        self.assertEqual(stats.phase_summary('responses')['count'], 0)
+        self.assertTrue('run_iteration' in str(stats))
+
+        # Percentile estimate doesn't need every time to be kept.
+        stats = RunStatistics()
+        for i in range(100000):
+            stats.record('callback', 0.001 * (i % 1000 + 1))
+        self.assertTrue(len(stats.times['callback'][4]) <= 301)
+        p95 = stats.phase_summary('callback')['p95']
+        self.assertTrue(abs(p95 - 0.95) < 0.95 * 0.015)
+
+    def test_progress(self):
+        logging.debug('')
+        logging.debug('test_progress')
+
+        stats = RunStatistics(report_interval=10.)
+        now = time.time()
+        self.assertFalse(stats.evaluation_done(now))
+        self.assertTrue(stats.evaluation_done(now + 11.))
+        self.assertFalse(stats.evaluation_done(now + 12.))
+        self.assertTrue(stats.evaluation_done(now + 22.))
+        self.assertFalse(stats.evaluation_done(now + 23., 10))
+        self.assertTrue(stats.progress().startswith('14 evaluations'))
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=dakota_driver')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()
@@ -0,0 +1,152 @@
+""" Test parallel evaluation support. """
+
+import logging
+import nose
+import os
+import sys
+import time
+import unittest
+
+from numpy import array
+
+from dakota_driver.parallel import AsyncScheduler, EvaluationPool, \
+                                   SharedSlots
+
+
+class Quadratic(object):
+    """ Picklable evaluator returning ``sum(x**2)`` and the worker pid. """
+
+    def __call__(self, point, asv):
+        return array([sum(x**2 for x in point), os.getpid()])
+
+
+class Sleepy(object):
+    """ Picklable evaluator which sleeps for ``point[0]`` seconds. """
+
+    def __call__(self, point, asv):
+        time.sleep(point[0])
+        return array([point[0]])
+
+
+class Failing(object):
+    """ Picklable evaluator which always raises an exception. """
+
+    def __call__(self, point, asv):
+        raise RuntimeError('Evaluating %s' % list(point))
+
+
+class TestCase(unittest.TestCase):
+    """ Test parallel evaluation support. """
+
+    def test_evaluate(self):
+        logging.debug('')
+        logging.debug('test_evaluate')
+
+        points = [[float(i), 1.] for i in range(20)]
+        pool = EvaluationPool(Quadratic(), 2)
+        try:
+            fns = pool.evaluate(points, [1])
+        finally:
+            pool.close()
+
+        self.assertEqual(fns.shape, (20, 2))
+        self.assertEqual(list(fns[:, 0]), [i*i + 1. for i in range(20)])
+        self.assertFalse(os.getpid() in fns[:, 1])
+
+    def test_scheduler(self):
+        logging.debug('')
+        logging.debug('test_scheduler')
+
+        scheduler = AsyncScheduler(EvaluationPool(Sleepy(), 3), 2)
+        try:
+            slow = scheduler.submit([0.5], [1])
+            fast = scheduler.submit([0.], [1])
+            self.assertEqual(scheduler.in_flight, 2)
+            ticket, vals = scheduler.next_completed()
+            self.assertEqual(ticket, fast)
+
+            # Accepts new work while the slow point is still running.
+            fast = scheduler.submit([0.], [1])
+            ticket, vals = scheduler.next_completed()
+            self.assertEqual(ticket, fast)
+            ticket, vals = scheduler.next_completed()
+            self.assertEqual(ticket, slow)
+            self.assertEqual(vals[0], 0.5)
+            self.assertEqual(scheduler.in_flight, 0)
+
+            # Concurrency limit of 2 on 3 workers.
+            for i in range(4):
+                scheduler.submit([0.2], [1])
+            self.assertEqual(scheduler.in_flight, 4)
+            start = time.time()
+            self.assertEqual(len(list(scheduler.as_completed())), 4)
+            self.assertTrue(time.time() - start >= 0.4)
+        finally:
+            scheduler.close()
+
+        scheduler = AsyncScheduler(EvaluationPool(Failing(), 2))
+        try:
+            scheduler.submit([1.], [1])
+            self.assertRaises(RuntimeError, scheduler.next_completed)
+            failed = scheduler.submit([2.], [1])
+            ticket, exc, vals = scheduler.next_completed(errors=True)
+            self.assertEqual(ticket, failed)
+            self.assertTrue('Evaluating [2.0]' in str(exc))
+            self.assertEqual(vals, None)
+        finally:
+            scheduler.terminate()
+
+    def test_shared(self):
+        logging.debug('')
+        logging.debug('test_shared')
+
+        # More points than slots, so slots are reused.
+        points = [[float(i), 1.] for i in range(20)]
+        pool = EvaluationPool(Quadratic(), 2, SharedSlots(8, 2, 2))
+        try:
+            fns = pool.evaluate(points, [1, 1])
+        finally:
+            pool.close()
+
+        self.assertEqual(fns.shape, (20, 2))
+        self.assertEqual(list(fns[:, 0]), [i*i + 1. for i in range(20)])
+        self.assertFalse(os.getpid() in fns[:, 1])
+
+        # Submissions beyond the free slots are pickled instead.
+        scheduler = AsyncScheduler(EvaluationPool(Sleepy(), 2,
+                                                  SharedSlots(1, 1, 1)), 2)
+        try:
+            tickets = [scheduler.submit([0.1 * i], [1]) for i in range(4)]
+            results = dict(scheduler.as_completed())
+            self.assertEqual(sorted(results), tickets)
+            for i, ticket in enumerate(tickets):
+                self.assertEqual(results[ticket][0], 0.1 * i)
+        finally:
+            scheduler.close()
+
+        pool = EvaluationPool(Failing(), 2, SharedSlots(2, 2, 1))
+        try:
+            self.assertRaises(RuntimeError, pool.evaluate,
+                              [[1., 2.], [3., 4.]], [1])
+        finally:
+            pool.terminate()
+
+    def test_error(self):
+        logging.debug('')
+        logging.debug('test_error')
+
+        pool = EvaluationPool(Failing(), 2)
+        try:
+            pool.evaluate([[1., 2.], [3., 4.]], [1])
+        except RuntimeError as exc:
+            self.assertTrue('Evaluating' in str(exc))
+        else:
+            self.fail('Expected RuntimeError')
+        finally:
+            pool.terminate()
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=dakota_driver')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()
@@ -0,0 +1,84 @@
+""" Test vectorized generation of study points. """
+
+import logging
+import nose
+import sys
+import unittest
+
+from numpy import floor, sort
+
+from dakota_driver.sampling import grid_points, vector_points, \
+                                   lhs_points, random_points, \
+                                   pick_freeze_points, pick_freeze_blocks
+
+
+class TestCase(unittest.TestCase):
+    """ Test vectorized generation of study points. """
+
+    def test_grid(self):
+        logging.debug('')
+        logging.debug('test_grid')
+
+        points = grid_points([0., -1.], [1., 1.], [2, 1])
+        self.assertEqual(points.tolist(), [[0., -1.], [0.5, -1.], [1., -1.],
+                                           [0., 1.], [0.5, 1.], [1., 1.]])
+        self.assertEqual(grid_points([0.] * 3, [1.] * 3, [2, 2, 4]).shape,
+                         (3 * 3 * 5, 3))
+
+    def test_vector(self):
+        logging.debug('')
+        logging.debug('test_vector')
+
+        points = vector_points([0., 1.], [2., -1.], 4)
+        self.assertEqual(points.tolist(), [[0., 1.], [0.5, 0.5], [1., 0.],
+                                           [1.5, -0.5], [2., -1.]])
+
+    def test_random(self):
+        logging.debug('')
+        logging.debug('test_random')
+
+        low = [-2., 0.]
+        high = [2., 10.]
+        for generate in (lhs_points, random_points):
+            points = generate(low, high, 50, 52983)
+            self.assertEqual(points.shape, (50, 2))
+            self.assertTrue((points >= low).all())
+            self.assertTrue((points <= high).all())
+            self.assertEqual(points.tolist(),
+                             generate(low, high, 50, 52983).tolist())
+            self.assertNotEqual(points.tolist(),
+                                generate(low, high, 50, 12345).tolist())
+
+        # One sample in each of the equal probability intervals.
+        points = lhs_points(low, high, 50, 52983)
+        for i in range(2):
+            strata = floor((points[:, i] - low[i]) / (high[i] - low[i]) * 50)
+            self.assertEqual(sort(strata).tolist(), range(50))
+
+    def test_pick_freeze(self):
+        logging.debug('')
+        logging.debug('test_pick_freeze')
+
+        points = pick_freeze_points([[1., 2.], [3., 4.]],
+                                    [[5., 6.], [7., 8.]])
+        self.assertEqual(points.tolist(), [[1., 2.], [5., 6.], [5., 2.],
+                                           [1., 6.], [3., 4.], [7., 8.],
+                                           [7., 4.], [3., 8.]])
+
+        # Blocks of whole samples, reproducible from the seed.
+        low, high = [0., 0., 0.], [1., 1., 1.]
+        blocks = list(pick_freeze_blocks(low, high, 50, 52983, 100))
+        self.assertEqual([len(block) for block in blocks], [100, 100, 50])
+        again = list(pick_freeze_blocks(low, high, 50, 52983, 100))
+        self.assertEqual(blocks[-1].tolist(), again[-1].tolist())
+        for block in blocks:
+            samples = block.reshape((-1, 5, 3))
+            for i in range(3):
+                self.assertEqual(samples[:, i + 2, i].tolist(),
+                                 samples[:, 1, i].tolist())
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=dakota_driver')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()
@@ -0,0 +1,88 @@
+""" Test streaming statistics. """
+
+import logging
+import nose
+import sys
+import unittest
+
+from numpy import corrcoef, cos, pi, sin
+from numpy.random import RandomState
+
+from dakota_driver.sampling import pick_freeze_points
+from dakota_driver.stats import RunningMoments, RunningCorrelation, \
+                                SobolIndices
+
+
+class TestCase(unittest.TestCase):
+    """ Test streaming statistics. """
+
+    def test_moments(self):
+        logging.debug('')
+        logging.debug('test_moments')
+
+        rows = RandomState(1).normal(1.e6, 2., size=(1000, 3))
+        moments = RunningMoments(3)
+        moments.add(rows[0])
+        for start in range(1, 1000, 77):
+            moments.add(rows[start:start + 77])
+        self.assertEqual(moments.count, 1000)
+        for i in range(3):
+            self.assertAlmostEqual(moments.mean[i], rows[:, i].mean(), 6)
+            self.assertAlmostEqual(moments.std()[i],
+                                   rows[:, i].std(ddof=1), 10)
+
+        moments = RunningMoments(2)
+        moments.add([[1., 2.]])
+        self.assertTrue((moments.variance() != moments.variance()).all())
+
+    def test_correlation(self):
+        logging.debug('')
+        logging.debug('test_correlation')
+
+        random = RandomState(2)
+        x = random.uniform(size=(500, 2))
+        y = x.dot([[1., 2., 0.], [3., -1., 0.]]) + random.normal(size=(500, 3))
+        correlation = RunningCorrelation(2, 3)
+        for start in range(0, 500, 64):
+            correlation.add(x[start:start + 64], y[start:start + 64])
+        self.assertEqual(correlation.count, 500)
+        expected = corrcoef(x, y, rowvar=False)[:2, 2:]
+        for i in range(2):
+            for j in range(3):
+                self.assertAlmostEqual(correlation.correlation()[i, j],
+                                       expected[i, j], 10)
+
+    def test_sobol(self):
+        logging.debug('')
+        logging.debug('test_sobol')
+
+        # Ishigami function, analytic indices from Sobol & Levitan (1999).
+        a, b = 7., 0.1
+        random = RandomState(3)
+        base = random.uniform(-pi, pi, size=(40000, 3))
+        points = pick_freeze_points(base[:20000], base[20000:])
+        self.assertEqual(points.shape, (20000 * 5, 3))
+        x1, x2, x3 = points.T
+        fns = sin(x1) + a * sin(x2)**2 + b * x3**4 * sin(x1)
+        fns = fns.reshape((-1, 5, 1))
+
+        sobol = SobolIndices(3, 1)
+        for start in range(0, 20000, 1000):
+            block = fns[start:start + 1000]
+            sobol.add(block[:, 0], block[:, 1], block[:, 2:])
+        self.assertEqual(sobol.count, 20000)
+
+        variance = a**2 / 8 + b * pi**4 / 5 + b**2 * pi**8 / 18 + 0.5
+        first = [0.5 * (1 + b * pi**4 / 5)**2 / variance,
+                 a**2 / 8 / variance, 0.]
+        total = [first[0] + 8 * b**2 * pi**8 / 225 / variance,
+                 first[1], 8 * b**2 * pi**8 / 225 / variance]
+        for i in range(3):
+            self.assertTrue(abs(sobol.first_order()[i, 0] - first[i]) < 0.03)
+            self.assertTrue(abs(sobol.total()[i, 0] - total[i]) < 0.03)
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=dakota_driver')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()
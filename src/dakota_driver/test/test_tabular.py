@@ -0,0 +1,76 @@
+""" Test binary tabular evaluation files. """
+
+import logging
+import nose
+import os.path
+import shutil
+import sys
+import tempfile
+import unittest
+
+from numpy import array
+
+from dakota_driver.tabular import TabularWriter, iter_tabular, \
+                                  load_tabular, read_columns
+
+
+class TestCase(unittest.TestCase):
+    """ Test binary tabular evaluation files. """
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'evaluations.tab')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_roundtrip(self):
+        logging.debug('')
+        logging.debug('test_roundtrip')
+
+        columns = ['eval_id', 'x1', 'x2', 'f']
+        writer = TabularWriter(self.filename, columns, chunk_rows=7)
+        for i in range(25):
+            writer.write_row(i + 1, array([i, -i]), [i * 0.5])
+        self.assertEqual(writer.rows, 25)
+        self.assertRaises(ValueError, writer.write_row, 1, [2., 3.])
+        writer.close()
+
+        self.assertEqual(read_columns(self.filename), columns)
+
+        chunks = list(iter_tabular(self.filename, chunk_rows=10))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual(list(chunks[2][-1]), [25., 24., -24., 12.])
+
+        names, data = load_tabular(self.filename)
+        self.assertEqual(names, columns)
+        self.assertEqual(data.shape, (25, 4))
+        self.assertEqual(data[:, 3].sum(), 0.5 * sum(range(25)))
+        del data
+
+    def test_partial(self):
+        logging.debug('')
+        logging.debug('test_partial')
+
+        writer = TabularWriter(self.filename, ['a', 'b'])
+        writer.flush()
+        self.assertEqual(list(iter_tabular(self.filename)), [])
+        self.assertEqual(load_tabular(self.filename)[1].shape, (0, 2))
+
+        writer.write_row(1., 2.)
+        writer.close()
+        with open(self.filename, 'ab') as out:
+            out.write('\0' * 4)  # Incomplete row.
+        names, data = load_tabular(self.filename)
+        self.assertEqual(data.shape, (1, 2))
+        del data
+
+        with open(self.filename, 'wb') as out:
+            out.write('junk')
+        self.assertRaises(ValueError, read_columns, self.filename)
+
+
+if __name__ == '__main__':
+    sys.argv.append('--cover-package=dakota_driver')
+    sys.argv.append('--cover-erase')
+    nose.runmodule()